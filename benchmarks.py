@@ -0,0 +1,204 @@
+"""
+Benchmarks of term lookups, template rendering and writes at glossary scale.
+
+Builds in-memory SQLite glossaries (with alias chains) of the given sizes and
+reports latency percentiles and queries of every operation::
+
+    python benchmarks.py                     # 1k, 10k and 100k terms
+    python benchmarks.py 1000 10000 --samples 500
+    python benchmarks.py 1000 --check        # fails if a fixed template needs more queries
+
+Results are reproducible: glossaries and sampled keys only depend on --seed.
+"""
+import random
+import sys
+import time
+from optparse import OptionParser
+
+from django.conf import settings
+
+settings.configure(
+    DEBUG=False,
+    USE_TZ=True,
+    DATABASES={
+        "default": {
+            "ENGINE": "django.db.backends.sqlite3",
+            "NAME": ':memory:'
+        }
+    },
+    CACHES={
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+            "OPTIONS": {"MAX_ENTRIES": 1000000},
+        }
+    },
+    MIDDLEWARE_CLASSES=(),
+    INSTALLED_APPS=[
+        "django.contrib.auth",
+        "django.contrib.contenttypes",
+        "idioticon",
+    ],
+)
+
+try:
+    import django
+    setup = django.setup
+except AttributeError:
+    pass
+else:
+    setup()
+
+from django.db import connection
+from django.template import Template, Context
+from django.test.utils import CaptureQueriesContext
+
+from idioticon import cache, shortcuts
+
+SIZES = (1000, 10000, 100000)
+
+# share of aliases in the glossary, and max length of alias chains
+ALIASES = 0.2
+MAX_CHAIN = 3
+
+# terms used by the fixed templates
+TEMPLATE_TERMS = 10
+
+# max queries of the fixed templates, checked with --check
+QUERY_BUDGETS = {
+    'load_terms template (cold)': 1,
+    'load_terms template (warm)': 0,
+    'term_tag template (cold)': 1,
+    'term_tag template (warm)': 0,
+    'get_term (warm)': 0,
+}
+
+
+def get_rows(size, rnd):
+    """Yields the term rows of a glossary of size terms: main terms first, then alias chains."""
+    mains = int(size * (1 - ALIASES))
+    for i in range(mains):
+        yield {'key': 'term-%06d' % i, 'name': 'Term %d' % i, 'definition': 'Definition of term %d. ' % i * 5}
+    i = 0
+    while i < size - mains:
+        main_term = 'term-%06d' % rnd.randrange(mains)
+        for _ in range(rnd.randint(1, MAX_CHAIN)):
+            if i >= size - mains:
+                break
+            key = 'alias-%06d' % i
+            yield {'key': key, 'main_term': main_term, 'name': '', 'definition': ''}
+            main_term = key
+            i += 1
+
+
+def percentile(values, percent):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * percent / 100.0))]
+
+
+def measure(operation, samples, before=None):
+    """Runs operation(i) samples times, after before(i) if given,
+    returns the latencies (seconds) and the max queries."""
+    timings, queries = [], 0
+    for i in range(samples):
+        if before is not None:
+            before(i)
+        with CaptureQueriesContext(connection) as captured:
+            started = time.time()
+            operation(i)
+            timings.append(time.time() - started)
+        queries = max(queries, len(captured.captured_queries))
+    return timings, queries
+
+
+def run(size, samples, rnd):
+    """Benchmarks a glossary of size terms, returns (operation, timings, max queries) tuples."""
+    Term = shortcuts.get_term_model()
+    Term.objects.all().delete()
+    cache.get_cache().clear()
+
+    started = time.time()
+    Term.objects.import_terms(get_rows(size, rnd))
+    results = [('import_terms (%d terms)' % size, [time.time() - started], None)]
+
+    keys = list(Term.objects.values_list('key', flat=True))
+    sampled = [rnd.sample(keys, TEMPLATE_TERMS) for _ in range(samples)]
+    load_terms = [Template("{%% load idioticon %%}{%% load_terms %s as %s %%}%s" % (
+        ' '.join(terms), ' '.join('t%d' % n for n in range(len(terms))),
+        ''.join('{{ t%d.get_name }}' % n for n in range(len(terms))))) for terms in sampled]
+    term_tags = [Template("{% load idioticon %}" + ''.join("{%% term_tag '%s' %%}" % key for key in terms))
+                 for terms in sampled]
+
+    def clear(i):
+        cache.get_cache().clear()
+
+    def get_term(i):
+        shortcuts.get_term(sampled[i][0])
+
+    def get_terms(i):
+        shortcuts.get_terms(sampled[i])
+
+    def render_load_terms(i):
+        load_terms[i].render(Context())
+
+    def render_term_tags(i):
+        term_tags[i].render(Context())
+
+    # warm operations are measured when run the second time
+    operations = [
+        ('get_term (cold)', get_term, clear),
+        ('get_term (warm)', get_term, get_term),
+        ('get_terms x%d (cold)' % TEMPLATE_TERMS, get_terms, clear),
+        ('load_terms template (cold)', render_load_terms, clear),
+        ('load_terms template (warm)', render_load_terms, render_load_terms),
+        ('term_tag template (cold)', render_term_tags, clear),
+        ('term_tag template (warm)', render_term_tags, render_term_tags),
+        ('set_term', lambda i: shortcuts.set_term(sampled[i][0], name='Renamed %d' % i), None),
+        ('add_alias', lambda i: shortcuts.add_alias(sampled[i][0], 'bench-alias-%d-%d' % (size, i)), None),
+    ]
+    for name, operation, before in operations:
+        timings, queries = measure(operation, samples, before)
+        results.append((name, timings, queries))
+    return results
+
+
+def report(size, results):
+    sys.stdout.write("\n%d terms\n" % size)
+    sys.stdout.write("%-32s %10s %10s %10s %8s\n" % ('operation', 'p50 ms', 'p90 ms', 'p99 ms', 'queries'))
+    for name, timings, queries in results:
+        sys.stdout.write("%-32s %10.3f %10.3f %10.3f %8s\n" % (
+            name, percentile(timings, 50) * 1000, percentile(timings, 90) * 1000, percentile(timings, 99) * 1000,
+            '-' if queries is None else queries))
+
+
+def check(results):
+    """Returns the regressions of the query budgets."""
+    return ["%s: %d queries (max %d)" % (name, queries, QUERY_BUDGETS[name])
+            for name, timings, queries in results
+            if name in QUERY_BUDGETS and queries > QUERY_BUDGETS[name]]
+
+
+def main(argv):
+    parser = OptionParser(usage="%prog [options] [<size> ...]")
+    parser.add_option('--samples', dest='samples', type='int', default=200,
+                      help="Runs of every operation.")
+    parser.add_option('--seed', dest='seed', type='int', default=0,
+                      help="Seed of the glossaries and sampled keys.")
+    parser.add_option('--check', dest='check', action='store_true', default=False,
+                      help="Fail if an operation needs more queries than budgeted.")
+    options, args = parser.parse_args(argv)
+
+    connection.creation.create_test_db(verbosity=0)
+    regressions = []
+    for size in [int(arg) for arg in args] or SIZES:
+        results = run(size, options.samples, random.Random(options.seed))
+        report(size, results)
+        regressions.extend("%d terms, %s" % (size, regression) for regression in check(results))
+
+    if options.check and regressions:
+        sys.stderr.write("\nQuery budgets exceeded:\n%s\n" % '\n'.join(regressions))
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
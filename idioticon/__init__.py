@@ -7,6 +7,9 @@ import logging
 __author__ = 'openpolis'
 __version__ = (0, 1, 0)
 
+# Django >= 1.7
+default_app_config = 'idioticon.apps.IdioticonConfig'
+
 def get_version(version=None):
     """
     Returns a string version number from __version__
@@ -22,4 +25,5 @@ stream.setLevel(logging.INFO)
 log.addHandler(stream)
 
 
-from idioticon.shortcuts import get_term, add_term, update_term, set_term, delete_term, add_alias
+from idioticon.shortcuts import get_term, get_terms, add_term, update_term, set_term, delete_term, add_alias, \
+    set_terms, update_terms, delete_terms
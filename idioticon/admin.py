@@ -1,6 +1,10 @@
 from django.contrib import admin
 from django.contrib.admin import SimpleListFilter
+from django.db.models import Count
+from django.forms.models import BaseInlineFormSet
+from django.utils.translation import ugettext_lazy as _
 from .models import Term
+from .search import WORD_RE, search
 
 class TermTypeFilter(SimpleListFilter):
     title = 'Type of term'
@@ -18,17 +22,71 @@ class TermTypeFilter(SimpleListFilter):
         elif self.value() == 'linked':
             return queryset.filter(main_term__isnull=False)
 
+class AliasFormSet(BaseInlineFormSet):
+    """Shows a page of the aliases ordered by key, instead of all of them."""
+    per_page = 20
+    page = 1
+
+    def get_queryset(self):
+        if not hasattr(self, '_queryset'):
+            queryset = self.queryset.order_by('key')
+            self.total = queryset.count()
+            offset = (self.page - 1) * self.per_page
+            pks = list(queryset.values_list('pk', flat=True)[offset:offset + self.per_page])
+            self._queryset = queryset.filter(pk__in=pks)
+        return self._queryset
+
+    def get_pages(self):
+        self.get_queryset()
+        return list(range(1, (self.total - 1) // self.per_page + 2))
+
 class TermInline(admin.TabularInline):
     model = Term
+    fk_name = 'main_term'
+    formset = AliasFormSet
     extra = 1
     fields = ('key', 'name')
+    template = 'admin/idioticon/term/alias_inline.html'
+    # query string parameter of the aliases page
+    page_var = 'aliases_page'
+
+    def get_formset(self, request, obj=None, **kwargs):
+        formset = super(TermInline, self).get_formset(request, obj, **kwargs)
+        try:
+            page = max(1, int(request.GET.get(self.page_var, 1)))
+        except ValueError:
+            page = 1
+        return type(formset.__name__, (formset,), {'page': page, 'page_var': self.page_var})
 
 class TermAdmin(admin.ModelAdmin):
     prepopulated_fields = {"key": ("name",)}
     list_filter = [TermTypeFilter, ]
     inlines = [TermInline, ]
     ordering = ('key', )
-    list_display = ('key', 'name', 'main_term')
-    search_fields = ('key', 'name',)
+    list_display = ('key', 'name', 'main_term_key', 'alias_count')
+    list_select_related = ('main_term', )
+    raw_id_fields = ('main_term', )
+    search_fields = ('key', 'name', 'definition')
+
+    def get_queryset(self, request):
+        # alias counts in the same query as the terms
+        return super(TermAdmin, self).get_queryset(request).annotate(alias_count=Count('aliases'))
+
+    def get_search_results(self, request, queryset, search_term):
+        # called without search words too, listing every term
+        if not WORD_RE.search(search_term or ''):
+            return queryset, False
+        # full-text search, in the active language
+        return search(queryset, search_term), False
+
+    def main_term_key(self, obj):
+        return obj.main_term.key if obj.main_term_id else ''
+    main_term_key.short_description = _("Main definition")
+    main_term_key.admin_order_field = 'main_term__key'
+
+    def alias_count(self, obj):
+        return obj.alias_count
+    alias_count.short_description = _("Aliases")
+    alias_count.admin_order_field = 'alias_count'
 
-admin.site.register(Term, TermAdmin)
\ No newline at end of file
+admin.site.register(Term, TermAdmin)
@@ -0,0 +1,134 @@
+"""
+Asynchronous shortcuts, for ASGI deployments (Python 3.5+ only).
+
+This Django has neither an asynchronous ORM nor an asynchronous cache API,
+so queries and writes run in a thread: concurrent lookups share one batched
+query for the keys they are waiting for, so a burst of requests for the same
+terms costs a single thread hop.
+Terms found in the glossary snapshot or in a local-memory terms cache are
+returned without leaving the event loop; other caches (e.g. memcached or redis)
+are read in a thread too, not to block the loop on the network.
+"""
+import asyncio
+from collections import OrderedDict
+
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+
+from idioticon import cache, shortcuts
+from idioticon.snapshot import get_snapshot
+
+# in-flight lookups, by event loop and key
+_lookups = {}
+
+
+async def run_sync(func, *args, **kwargs):
+    """Runs a blocking (database) call in the default executor of the event loop."""
+    loop = asyncio.get_event_loop()
+    return await loop.run_in_executor(None, lambda: func(*args, **kwargs))
+
+
+def is_local_cache():
+    """Tells whether the terms cache can be read without blocking the event loop."""
+    backend = cache.get_cache()
+    return backend is None or isinstance(backend, (LocMemCache, DummyCache))
+
+
+async def _read_cache(func, *args):
+    """Calls a function reading the terms cache (or the glossary version), in a thread if it blocks."""
+    if is_local_cache():
+        return func(*args)
+    return await run_sync(func, *args)
+
+
+async def _fetch(loop, keys):
+    try:
+        return await run_sync(shortcuts.get_term_model().objects.get_terms, keys, soft_error=True)
+    finally:
+        for key in keys:
+            _lookups.pop((loop, key), None)
+
+
+async def aget_terms(keys, soft_error=True):
+    """
+    Retrieve many terms by key, see shortcuts.get_terms.
+
+    :return: requested Terms by key (None for missing keys if soft_error is True).
+    :rtype: OrderedDict
+    :raises Term.DoesNotExist
+    """
+    snapshot = await _read_cache(get_snapshot, False)
+    if snapshot is not None:
+        return snapshot.get_terms(keys, soft_error=soft_error)
+    Term = shortcuts.get_term_model()
+    keys = list(keys)
+    terms = dict((key.key, key) for key in keys if isinstance(key, Term))
+    keys = [key.key if isinstance(key, Term) else key for key in keys]
+    cached = await _read_cache(cache.get_cached_terms, [key for key in keys if key not in terms])
+    terms.update((key, term) for key, term in cached.items() if not cache.is_missing(term))
+
+    loop = asyncio.get_event_loop()
+    missing = [key for key in keys if key not in terms and key not in cached]
+    new = [key for key in missing if (loop, key) not in _lookups]
+    if new:
+        lookup = loop.create_task(_fetch(loop, new))
+        for key in new:
+            _lookups[(loop, key)] = lookup
+    for lookup in set(_lookups[(loop, key)] for key in missing if (loop, key) in _lookups):
+        found = await lookup
+        terms.update((key, term) for key, term in found.items() if term is not None)
+
+    missing = [key for key in keys if key not in terms]
+    if missing and not soft_error:
+        raise Term.DoesNotExist("Terms not found: %s" % ', '.join(missing))
+
+    return OrderedDict((key, terms.get(key)) for key in keys)
+
+
+async def aget_term(key, soft_error=True):
+    """
+    Retrieve a term by key, see shortcuts.get_term.
+
+    :return: a required Term or None if soft_error is True and key not found.
+    :rtype: Term or None
+    :raises Term.DoesNotExist
+    """
+    if isinstance(key, shortcuts.get_term_model()):
+        return key
+    snapshot = await _read_cache(get_snapshot, False)
+    if snapshot is not None:
+        return snapshot.get_term(key, soft_error=soft_error)
+    term = await _read_cache(cache.get_cached_term, key)
+    if cache.is_missing(term):
+        if not soft_error:
+            raise shortcuts.get_term_model().DoesNotExist("Term not found: %s" % key)
+        return None
+    if term is not None:
+        return term
+    terms = await aget_terms([key], soft_error=soft_error)
+    return terms[key]
+
+
+async def aadd_term(key, name='', definition=''):
+    """See shortcuts.add_term."""
+    return await run_sync(shortcuts.add_term, key, name, definition)
+
+
+async def aset_term(key, name=None, definition=None):
+    """See shortcuts.set_term."""
+    return await run_sync(shortcuts.set_term, key, name, definition)
+
+
+async def aupdate_term(key, name=None, definition=None):
+    """See shortcuts.update_term."""
+    return await run_sync(shortcuts.update_term, key, name, definition)
+
+
+async def adelete_term(key, alias_cascade=True):
+    """See shortcuts.delete_term."""
+    return await run_sync(shortcuts.delete_term, key, alias_cascade)
+
+
+async def aadd_alias(term, alias, name='', definition=''):
+    """See shortcuts.add_alias."""
+    return await run_sync(shortcuts.add_alias, term, alias, name, definition)
@@ -0,0 +1,27 @@
+from django.apps import AppConfig
+from django.core.checks import register
+from django.db import DatabaseError
+
+from idioticon import log
+from idioticon.conf import settings
+
+
+class IdioticonConfig(AppConfig):
+    name = 'idioticon'
+    verbose_name = 'Idioticon'
+
+    def ready(self):
+        from idioticon.checks import check_alias_chains
+        try:
+            # queries the terms: only with check --deploy
+            register(check_alias_chains, 'idioticon', deploy=True)
+        except TypeError:
+            # Django 1.7, without deployment checks
+            pass
+        if settings.IDIOTICON_SNAPSHOT and settings.IDIOTICON_SNAPSHOT_ON_READY:
+            from idioticon.snapshot import load_snapshot
+            try:
+                load_snapshot()
+            except DatabaseError:
+                # e.g. before the terms table is created
+                log.warning("Unable to load the glossary snapshot", exc_info=True)
@@ -0,0 +1,143 @@
+"""
+Automatic glossary linking of html text.
+
+Every occurrence of a term name or key (aliases included) found in the text
+outside of tags is rendered with a term theme.
+Matching uses an Aho-Corasick automaton built from the whole glossary,
+kept per language and rebuilt only when the glossary version changes.
+"""
+import re
+import time
+
+from django.template import Context
+from django.utils.html import escape
+from django.utils.safestring import mark_safe
+from django.utils.translation import get_language, override
+
+from idioticon import cache, log, metrics, shortcuts
+from idioticon.automaton import Automaton
+from idioticon.conf import settings
+
+# shorter names and keys are not linked
+MIN_PATTERN_LENGTH = 3
+
+# text inside these elements is never linked
+SKIP_ELEMENTS = ('a', 'abbr', 'button', 'code', 'pre', 'script', 'style', 'textarea')
+
+TAG_RE = re.compile(r'(<!--.*?-->|<[^>]*>)', re.DOTALL)
+TAG_NAME_RE = re.compile(r'<\s*(/?)\s*([a-zA-Z0-9]+)')
+
+# automatons by language: (glossary version, automaton)
+_automatons = {}
+
+
+def _lower(text):
+    """Lowercases text without changing its length (so positions are preserved)."""
+    lowered = text.lower()
+    if len(lowered) == len(text):
+        return lowered
+    return ''.join(char.lower() if len(char.lower()) == 1 else char for char in text)
+
+
+def get_patterns(language=None):
+    """
+    Returns (pattern, key) pairs for all the terms, in the given language.
+    Main terms come first, so they win over aliases with the same name.
+    """
+    with override(language or get_language()):
+        terms = shortcuts.get_term_model().objects.values_list('key', 'name', 'main_term')
+        terms = sorted(terms, key=lambda term: term[2] is not None)
+    for key, name, main_term in terms:
+        for pattern in (name, key, key.replace('-', ' ')):
+            if pattern and len(pattern) >= MIN_PATTERN_LENGTH:
+                yield _lower(escape(pattern)), key
+
+
+def get_automaton(language=None):
+    """Returns the glossary automaton for the language, building it if the glossary changed."""
+    language = language or get_language()
+    version = cache.get_glossary_version()
+    built = _automatons.get(language)
+    if built is None or built[0] != version:
+        built = _automatons[language] = (version, Automaton(get_patterns(language)))
+    return built[1]
+
+
+def _is_word(text, start, end):
+    return (start == 0 or not text[start - 1].isalnum()) and (end == len(text) or not text[end].isalnum())
+
+
+def idioticonize(html, theme=None, language=None):
+    """
+    Wraps every glossary term found in html text with its term theme.
+
+    :param html: html text
+    :type html: str
+    :param theme: term theme, IDIOTICON_THEME if None
+    :type theme: str
+    :param language: glossary language, the active one if None
+    :type language: str
+    :return: linked html
+    :rtype: SafeText
+    """
+    from idioticon.templatetags.idioticon import get_theme_template
+
+    automaton = get_automaton(language)
+    parts = TAG_RE.split(html)
+    matches = {}
+    skipping = []
+
+    # even parts are text, odd parts are tags or comments
+    for index, part in enumerate(parts):
+        if index % 2:
+            tag = TAG_NAME_RE.match(part)
+            if tag and tag.group(2).lower() in SKIP_ELEMENTS:
+                name = tag.group(2).lower()
+                if tag.group(1):
+                    if name in skipping:
+                        skipping.remove(name)
+                elif not part.rstrip('>').rstrip().endswith('/'):
+                    skipping.append(name)
+        elif part and not skipping:
+            found = automaton.find_all(_lower(part), _is_word)
+            if found:
+                matches[index] = found
+
+    if not matches:
+        return mark_safe(html)
+
+    keys = set(key for found in matches.values() for start, end, key in found)
+    terms = shortcuts.get_terms(keys)
+    theme = theme or settings.IDIOTICON_THEME
+    try:
+        template = get_theme_template(theme)
+    except Exception:
+        if settings.TEMPLATE_DEBUG:
+            raise
+        log.exception("Unable to render terms with theme %r", theme)
+        return mark_safe(html)
+
+    # rendered directly from the batched terms: the wordings of a text aren't worth caching
+    rendered = {}
+    collector = metrics.get_collector()
+    for index, found in matches.items():
+        text = parts[index]
+        linked = []
+        position = 0
+        for start, end, key in found:
+            term = terms.get(key)
+            if term is None:
+                continue
+            linked.append(text[position:start])
+            wording = text[start:end]
+            if (key, wording) not in rendered:
+                started = time.time()
+                rendered[key, wording] = template.render(Context({'term': term, 'text': mark_safe(wording)}))
+                if collector is not None:
+                    collector.add_render(started)
+            linked.append(rendered[key, wording])
+            position = end
+        linked.append(text[position:])
+        parts[index] = ''.join(linked)
+
+    return mark_safe(''.join(parts))
@@ -0,0 +1,87 @@
+"""
+Aho-Corasick multi-pattern matcher.
+
+The automaton is built once from all the patterns, then every search runs in
+time linear in the length of the text (plus the number of matches),
+regardless of how many patterns there are.
+"""
+from collections import deque
+
+
+class Automaton(object):
+
+    def __init__(self, patterns=()):
+        """
+        :param patterns: (pattern, value) pairs; the first value of a repeated pattern wins
+        :type patterns: iterable
+        """
+        # goto function, failure links and outputs of each state (state 0 is the root)
+        self._goto = [{}]
+        self._fail = [0]
+        self._outputs = [()]
+        for pattern, value in patterns:
+            self._add(pattern, value)
+        self._build()
+
+    def _add(self, pattern, value):
+        if not pattern:
+            return
+        state = 0
+        for char in pattern:
+            next_state = self._goto[state].get(char)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto[state][char] = next_state
+                self._goto.append({})
+                self._fail.append(0)
+                self._outputs.append(())
+            state = next_state
+        if not self._outputs[state]:
+            self._outputs[state] = ((len(pattern), value),)
+
+    def _build(self):
+        """Computes failure links breadth first, merging the outputs of the failure states."""
+        goto, fail, outputs = self._goto, self._fail, self._outputs
+        # states at depth 1 fail to the root
+        queue = deque(goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in goto[state].items():
+                queue.append(next_state)
+                failure = fail[state]
+                while failure and char not in goto[failure]:
+                    failure = fail[failure]
+                fail[next_state] = goto[failure].get(char, 0)
+                if outputs[fail[next_state]]:
+                    outputs[next_state] = outputs[next_state] + outputs[fail[next_state]]
+
+    def iter_matches(self, text):
+        """
+        Yields all the (start, end, value) matches in text, overlapping ones included.
+        """
+        goto, fail, outputs = self._goto, self._fail, self._outputs
+        state = 0
+        for index, char in enumerate(text):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            for length, value in outputs[state]:
+                yield index + 1 - length, index + 1, value
+
+    def find_all(self, text, accept=None):
+        """
+        Returns leftmost-longest, non overlapping (start, end, value) matches in text.
+
+        :param accept: optional callable(text, start, end) filtering the matches
+        """
+        matches = sorted(self.iter_matches(text), key=lambda match: (match[0], match[0] - match[1]))
+        selected = []
+        position = 0
+        for start, end, value in matches:
+            if start < position:
+                continue
+            if accept is not None and not accept(text, start, end):
+                continue
+            selected.append((start, end, value))
+            position = end
+        return selected
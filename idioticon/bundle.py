@@ -0,0 +1,95 @@
+"""
+Static glossary bundles.
+
+The whole glossary is dumped into one compact JSON file per language,
+``{"key": [name, definition, main term key], ...}`` with aliases resolved,
+named after a hash of its contents and saved in ``STATIC_ROOT``,
+so it can be served (and cached forever) by a CDN.
+The files are already hashed, so they bypass ``STATICFILES_STORAGE``:
+a manifest storage would hash their urls again.
+The current file of every language is listed in a manifest.
+"""
+import hashlib
+import json
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import FileSystemStorage
+from django.utils.translation import get_language, override
+
+from idioticon import cache
+from idioticon.shortcuts import get_term_model
+from idioticon.utils import get_languages
+
+MANIFEST_NAME = 'idioticon/glossary.json'
+BUNDLE_NAME = 'idioticon/glossary.%s.%s.json'
+
+
+def get_storage():
+    return FileSystemStorage(location=settings.STATIC_ROOT, base_url=settings.STATIC_URL)
+
+
+def build_bundles(languages, batch_size=500):
+    """Returns the JSON contents of the bundle of each language."""
+    data = dict((language, {}) for language in languages)
+    for term in get_term_model().objects.iter_terms(batch_size):
+        main_term = term.get_root_term().key if term.is_alias else None
+        for language in languages:
+            with override(language):
+                data[language][term.key] = [term.get_name(), term.get_definition(), main_term]
+    return dict((language, json.dumps(terms, sort_keys=True, separators=(',', ':')))
+                for language, terms in data.items())
+
+
+def get_manifest(storage=None):
+    """Returns the bundle file names by language."""
+    manifest = cache.get_cached_value('bundles')
+    if manifest is None:
+        storage = storage or get_storage()
+        if not storage.exists(MANIFEST_NAME):
+            return {}
+        with storage.open(MANIFEST_NAME) as f:
+            manifest = json.loads(f.read().decode('utf-8'))
+        cache.set_cached_value('bundles', manifest)
+    return manifest
+
+
+def write_bundles(languages=None, storage=None, batch_size=500):
+    """
+    Saves the bundles whose contents changed, and updates the manifest.
+
+    :returns: the languages whose bundle was written
+    :rtype: list
+    """
+    storage = storage or get_storage()
+    languages = languages or get_languages()
+    manifest = get_manifest(storage)
+    written = []
+
+    for language, content in sorted(build_bundles(languages, batch_size).items()):
+        content = content.encode('utf-8')
+        name = BUNDLE_NAME % (language, hashlib.md5(content).hexdigest()[:12])
+        if manifest.get(language) == name and storage.exists(name):
+            continue
+        if not storage.exists(name):
+            storage.save(name, ContentFile(content))
+        manifest[language] = name
+        written.append(language)
+
+    if written:
+        if storage.exists(MANIFEST_NAME):
+            storage.delete(MANIFEST_NAME)
+        storage.save(MANIFEST_NAME, ContentFile(json.dumps(manifest, sort_keys=True).encode('utf-8')))
+        cache.set_cached_value('bundles', manifest)
+    return written
+
+
+def get_bundle_url(language=None, storage=None):
+    """Returns the url of the bundle of the language (the active one by default), or None."""
+    manifest = get_manifest(storage)
+    name = manifest.get(language or get_language())
+    if name is None:
+        name = manifest.get(get_languages()[0])
+    if name is None:
+        return None
+    return (storage or get_storage()).url(name)
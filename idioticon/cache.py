@@ -0,0 +1,253 @@
+"""
+Shared cache layer for terms.
+
+Terms are stored in the cache configured by ``IDIOTICON_CACHE`` (a cache alias,
+``'default'`` by default) under ``IDIOTICON_CACHE_KEY_PREFIX + key``.
+Set ``IDIOTICON_CACHE`` to an empty value to disable caching.
+
+Keys looked up and not found are cached as ``MISSING`` for
+``IDIOTICON_MISSING_TIMEOUT`` seconds, until a term with that key is saved.
+"""
+import time
+from uuid import uuid4
+
+from idioticon.conf import settings
+from idioticon.config import string_types
+
+try:
+    # Django >= 1.7
+    from django.core.cache import caches
+
+    def _get_cache(alias):
+        return caches[alias]
+
+except ImportError:
+    from django.core.cache import get_cache as _get_cache
+
+
+def get_cache():
+    """Returns the configured cache backend, or None if caching is disabled."""
+    if not settings.IDIOTICON_CACHE:
+        return None
+    return _get_cache(settings.IDIOTICON_CACHE)
+
+
+def make_key(key):
+    return '%s%s' % (settings.IDIOTICON_CACHE_KEY_PREFIX, key)
+
+
+def make_value_key(name):
+    return '%s:%s' % (settings.IDIOTICON_CACHE_KEY_PREFIX, name)
+
+
+def make_version_key():
+    return make_value_key('version')
+
+
+def make_fragments_key(key):
+    # ':' never appears in a slug, so this can't clash with a term key
+    return '%s%s:html' % (settings.IDIOTICON_CACHE_KEY_PREFIX, key)
+
+
+def make_columns_key(key):
+    return '%s%s:only' % (settings.IDIOTICON_CACHE_KEY_PREFIX, key)
+
+
+def make_snapshot_key(key):
+    return '%s%s:snapshot' % (settings.IDIOTICON_CACHE_KEY_PREFIX, key)
+
+
+# cached in place of the terms known to be missing
+MISSING = 'idioticon:missing'
+
+
+def is_missing(value):
+    return isinstance(value, string_types) and value == MISSING
+
+
+def get_cached_term(key):
+    """Returns the cached term, MISSING if the key is known to be missing, or None."""
+    cache = get_cache()
+    if cache is None:
+        return None
+    return cache.get(make_key(key))
+
+
+def set_cached_term(term):
+    cache = get_cache()
+    if cache is None:
+        return
+    cache.set(make_key(term.key), term)
+
+
+def get_cached_terms(keys):
+    """Returns a dict of the cached terms by key, MISSING for the keys known
+    to be missing (keys not cached are left out)."""
+    cache = get_cache()
+    if cache is None or not keys:
+        return {}
+    cache_keys = dict((make_key(key), key) for key in keys)
+    cached = cache.get_many(list(cache_keys))
+    return dict((cache_keys[cache_key], term) for cache_key, term in cached.items())
+
+
+def set_cached_terms(terms):
+    cache = get_cache()
+    if cache is None or not terms:
+        return
+    cache.set_many(dict((make_key(term.key), term) for term in terms))
+
+
+def get_cached_snapshots(keys):
+    """Returns a dict of the cached term snapshots by key, MISSING for the keys
+    known to be missing (keys not cached are left out)."""
+    cache = get_cache()
+    if cache is None or not keys:
+        return {}
+    cache_keys = dict((make_snapshot_key(key), key) for key in keys)
+    cached = cache.get_many(list(cache_keys))
+    return dict((cache_keys[cache_key], snapshot) for cache_key, snapshot in cached.items())
+
+
+def set_cached_snapshots(snapshots):
+    cache = get_cache()
+    if cache is None or not snapshots:
+        return
+    cache.set_many(dict((make_snapshot_key(snapshot.key), snapshot) for snapshot in snapshots))
+
+
+def get_cached_narrow_terms(keys, columns):
+    """Returns a dict of the cached terms loaded with only the given columns, by key."""
+    cache = get_cache()
+    if cache is None or not keys:
+        return {}
+    cache_keys = dict((make_columns_key(key), key) for key in keys)
+    cached = cache.get_many(list(cache_keys))
+    terms = {}
+    for cache_key, variants in cached.items():
+        if tuple(columns) in variants:
+            terms[cache_keys[cache_key]] = variants[tuple(columns)]
+    return terms
+
+
+def set_cached_narrow_terms(terms, columns):
+    """Stores terms loaded with only the given columns.
+    All the column sets of a term are stored together, to be evicted with it."""
+    cache = get_cache()
+    if cache is None or not terms:
+        return
+    cache_keys = dict((make_columns_key(term.key), term) for term in terms)
+    cached = cache.get_many(list(cache_keys))
+    for cache_key, term in cache_keys.items():
+        cached.setdefault(cache_key, {})[tuple(columns)] = term
+    cache.set_many(cached)
+
+
+def set_missing_keys(keys, make=make_key):
+    """
+    Caches keys as missing for IDIOTICON_MISSING_TIMEOUT seconds,
+    under the cache keys returned by make (the term ones by default).
+    At most IDIOTICON_MISSING_MAX_KEYS keys are cached as missing in every
+    timeout period, so probing random keys can't fill the cache.
+    """
+    cache = get_cache()
+    timeout = settings.IDIOTICON_MISSING_TIMEOUT
+    keys = list(keys)
+    if cache is None or not timeout or not keys:
+        return
+    counter_key = make_value_key('missing:%d' % (time.time() // timeout))
+    cache.add(counter_key, 0, timeout * 2)
+    try:
+        count = cache.incr(counter_key, len(keys))
+    except ValueError:
+        # the counter was evicted
+        return
+    allowed = len(keys) - max(0, count - settings.IDIOTICON_MISSING_MAX_KEYS)
+    if allowed > 0:
+        cache.set_many(dict((make(key), MISSING) for key in keys[:allowed]), timeout)
+
+
+def get_cached_value(name):
+    """Returns a value derived from the glossary, stored by name, or None."""
+    cache = get_cache()
+    if cache is None:
+        return None
+    return cache.get(make_value_key(name))
+
+
+def set_cached_value(name, value):
+    cache = get_cache()
+    if cache is None:
+        return
+    cache.set(make_value_key(name), value)
+
+
+def get_cached_fragment(key, variant):
+    """Returns the html rendered for a term key in a variant
+    (theme, language, options), or None."""
+    cache = get_cache()
+    if cache is None:
+        return None
+    return (cache.get(make_fragments_key(key)) or {}).get(variant)
+
+
+def set_cached_fragment(key, variant, html):
+    """Stores the html rendered for a term key in a variant.
+    All the variants of a term are stored together, to be evicted with it."""
+    cache = get_cache()
+    if cache is None:
+        return
+    fragments_key = make_fragments_key(key)
+    fragments = cache.get(fragments_key) or {}
+    fragments[variant] = html
+    cache.set(fragments_key, fragments)
+
+
+def set_cached_fragments(fragments):
+    """Stores all the variants of many term keys at once, from a dict
+    of key -> {variant: html}, replacing the variants already stored."""
+    cache = get_cache()
+    if cache is None or not fragments:
+        return
+    cache.set_many(dict((make_fragments_key(key), variants) for key, variants in fragments.items()))
+
+
+def invalidate_keys(keys):
+    cache = get_cache()
+    if cache is None:
+        return
+    keys = set(keys)
+    if keys:
+        cache.delete_many([make_key(key) for key in keys] + [make_fragments_key(key) for key in keys] +
+                          [make_columns_key(key) for key in keys] + [make_snapshot_key(key) for key in keys])
+
+
+# glossary version of this process, used when caching is disabled
+_local_version = [uuid4().hex]
+
+
+def get_glossary_version():
+    """
+    Returns a token identifying the current contents of the glossary,
+    shared by all processes through the cache.
+    Data derived from the whole glossary can be kept as long as the token doesn't change.
+    """
+    cache = get_cache()
+    if cache is None:
+        return _local_version[0]
+    version = cache.get(make_version_key())
+    if version is None:
+        cache.add(make_version_key(), uuid4().hex)
+        version = cache.get(make_version_key())
+    if version is None:
+        # the cache doesn't store anything
+        return _local_version[0]
+    return version
+
+
+def bump_glossary_version():
+    """Signals that the glossary contents changed."""
+    _local_version[0] = uuid4().hex
+    cache = get_cache()
+    if cache is not None:
+        cache.set(make_version_key(), _local_version[0])
@@ -0,0 +1,27 @@
+"""
+System check of the alias chains, run by ``manage.py check --deploy`` (Django >= 1.8)
+and the ``idioticon_check_aliases`` command.
+"""
+from django.core.checks import Error
+from django.db import DatabaseError
+
+from idioticon import log
+from idioticon.shortcuts import get_term_model
+
+
+def check_alias_chains(app_configs=None, **kwargs):
+    """Reports the aliases in cycles, or at the end of chains longer than IDIOTICON_MAX_ALIAS_DEPTH."""
+    try:
+        cycles, too_deep = get_term_model().objects.check_alias_chains()
+    except DatabaseError:
+        # e.g. before the terms table is created
+        log.warning("Unable to check the alias chains", exc_info=True)
+        return []
+    errors = [Error("Alias %r is in a cycle of main terms." % key,
+                    hint="Set the main term of one of the aliases of the cycle to a main term.",
+                    id='idioticon.E001') for key in cycles]
+    errors.extend(Error("Alias %r is too far from its root term." % key,
+                        hint="Link the alias to a term closer to the root, "
+                             "or raise IDIOTICON_MAX_ALIAS_DEPTH.",
+                        id='idioticon.E002') for key in too_deep)
+    return errors
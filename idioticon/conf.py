@@ -2,7 +2,32 @@ from django.conf import settings
 
 TEXT_FIELD = getattr(settings, 'IDIOTICON_TEXT_FIELD', '')
 THEME = getattr(settings, 'IDIOTICON_THEME', 'span')
+CACHE = getattr(settings, 'IDIOTICON_CACHE', 'default')
+CACHE_KEY_PREFIX = getattr(settings, 'IDIOTICON_CACHE_KEY_PREFIX', 'term-')
+MISSING_TIMEOUT = getattr(settings, 'IDIOTICON_MISSING_TIMEOUT', 300)
+MISSING_MAX_KEYS = getattr(settings, 'IDIOTICON_MISSING_MAX_KEYS', 1000)
+SEARCH_CONFIGS = getattr(settings, 'IDIOTICON_SEARCH_CONFIGS', {})
+METRICS_HEADER = getattr(settings, 'IDIOTICON_METRICS_HEADER', '')
+SNAPSHOT = getattr(settings, 'IDIOTICON_SNAPSHOT', False)
+SNAPSHOT_INTERVAL = getattr(settings, 'IDIOTICON_SNAPSHOT_INTERVAL', 1)
+SNAPSHOT_ON_READY = getattr(settings, 'IDIOTICON_SNAPSHOT_ON_READY', False)
+TERM_SNAPSHOTS = getattr(settings, 'IDIOTICON_TERM_SNAPSHOTS', False)
+MAX_ALIAS_DEPTH = getattr(settings, 'IDIOTICON_MAX_ALIAS_DEPTH', 10)
+PRERENDER_THEMES = getattr(settings, 'IDIOTICON_PRERENDER_THEMES', ())
+SUMMARY_LENGTH = getattr(settings, 'IDIOTICON_SUMMARY_LENGTH', 160)
 
 setattr(settings, 'IDIOTICON_TEXT_FIELD', TEXT_FIELD)
 setattr(settings, 'IDIOTICON_THEME', THEME)
-
+setattr(settings, 'IDIOTICON_CACHE', CACHE)
+setattr(settings, 'IDIOTICON_CACHE_KEY_PREFIX', CACHE_KEY_PREFIX)
+setattr(settings, 'IDIOTICON_MISSING_TIMEOUT', MISSING_TIMEOUT)
+setattr(settings, 'IDIOTICON_MISSING_MAX_KEYS', MISSING_MAX_KEYS)
+setattr(settings, 'IDIOTICON_SEARCH_CONFIGS', SEARCH_CONFIGS)
+setattr(settings, 'IDIOTICON_METRICS_HEADER', METRICS_HEADER)
+setattr(settings, 'IDIOTICON_SNAPSHOT', SNAPSHOT)
+setattr(settings, 'IDIOTICON_SNAPSHOT_INTERVAL', SNAPSHOT_INTERVAL)
+setattr(settings, 'IDIOTICON_SNAPSHOT_ON_READY', SNAPSHOT_ON_READY)
+setattr(settings, 'IDIOTICON_TERM_SNAPSHOTS', TERM_SNAPSHOTS)
+setattr(settings, 'IDIOTICON_MAX_ALIAS_DEPTH', MAX_ALIAS_DEPTH)
+setattr(settings, 'IDIOTICON_PRERENDER_THEMES', PRERENDER_THEMES)
+setattr(settings, 'IDIOTICON_SUMMARY_LENGTH', SUMMARY_LENGTH)
@@ -10,6 +10,7 @@ if PY3:
     unicode = str
 else:
     string_types = basestring,
+    unicode = unicode
 
 # Setup default configurations
 IDIOTICON_DEFAULTS = {
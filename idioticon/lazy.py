@@ -0,0 +1,86 @@
+"""
+Lazy terms resolved in batch.
+
+While a request is processed by ``TermRegistryMiddleware``, lazy lookups return
+proxies registered in a request-scoped identity map: the first time any proxy
+is used, all the still pending keys are resolved with a single query.
+The same key always gets the same instance during the request.
+"""
+import threading
+
+try:
+    from collections import OrderedDict
+except ImportError:
+    # Python 2.6
+    from django.utils.datastructures import SortedDict as OrderedDict
+
+from django.utils.functional import SimpleLazyObject
+
+from idioticon import shortcuts
+
+_local = threading.local()
+
+
+class TermRegistry(object):
+
+    def __init__(self):
+        # resolved terms (None for missing keys), proxies and keys to resolve, by key
+        self.terms = {}
+        self.proxies = {}
+        self.pending = set()
+
+    def prefetch(self, keys):
+        """Registers keys to be resolved with the next batch."""
+        self.pending.update(key for key in keys if key not in self.terms)
+
+    def get_lazy(self, key):
+        """Returns the proxy of a term, resolved on first use."""
+        key = getattr(key, 'key', key)
+        if key not in self.proxies:
+            self.prefetch([key])
+            self.proxies[key] = SimpleLazyObject(lambda: self.resolve(key))
+        return self.proxies[key]
+
+    def get_lazy_terms(self, keys):
+        """Returns the proxies of many terms by key."""
+        keys = [getattr(key, 'key', key) for key in keys]
+        self.prefetch(keys)
+        return OrderedDict((key, self.get_lazy(key)) for key in keys)
+
+    def forget(self, keys):
+        """Drops changed terms, so their proxies are resolved again."""
+        for key in keys:
+            self.terms.pop(key, None)
+            self.proxies.pop(key, None)
+
+    def resolve(self, key):
+        """Returns the term of key (or None), resolving all the pending keys at once."""
+        key = getattr(key, 'key', key)
+        if key not in self.terms:
+            self.pending.add(key)
+            self.terms.update(shortcuts.get_terms(self.pending))
+            self.pending.clear()
+        return self.terms[key]
+
+
+def get_registry():
+    """Returns the registry of the current request, or None."""
+    return getattr(_local, 'registry', None)
+
+
+def set_registry(registry):
+    _local.registry = registry
+
+
+class TermRegistryMiddleware(object):
+    """Keeps a term registry for every request, to batch lazy term lookups."""
+
+    def process_request(self, request):
+        set_registry(TermRegistry())
+
+    def process_response(self, request, response):
+        set_registry(None)
+        return response
+
+    def process_exception(self, request, exception):
+        set_registry(None)
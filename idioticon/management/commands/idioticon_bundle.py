@@ -0,0 +1,22 @@
+from optparse import make_option
+
+from django.core.management.base import BaseCommand
+
+from idioticon.bundle import write_bundles
+
+
+class Command(BaseCommand):
+    args = '[<language> ...]'
+    help = "Writes the static glossary bundles of the languages (all by default) whose contents changed."
+
+    option_list = BaseCommand.option_list + (
+        make_option('--batch-size', dest='batch_size', type='int', default=500,
+                    help="Number of terms fetched at once."),
+    )
+
+    def handle(self, *args, **options):
+        written = write_bundles(list(args) or None, batch_size=options['batch_size'])
+        if written:
+            self.stdout.write("Glossary bundles written: %s." % ', '.join(written))
+        else:
+            self.stdout.write("Glossary bundles are up to date.")
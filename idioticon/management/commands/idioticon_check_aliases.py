@@ -0,0 +1,24 @@
+from optparse import make_option
+
+from django.core.management.base import BaseCommand, CommandError
+
+from idioticon.shortcuts import get_term_model
+
+
+class Command(BaseCommand):
+    help = "Checks that every alias leads to a main term, without cycles or too long chains."
+
+    option_list = BaseCommand.option_list + (
+        make_option('--max-depth', dest='max_depth', type='int', default=None,
+                    help="Longest chain allowed, IDIOTICON_MAX_ALIAS_DEPTH by default."),
+    )
+
+    def handle(self, *args, **options):
+        cycles, too_deep = get_term_model().objects.check_alias_chains(max_depth=options['max_depth'])
+        for key in cycles:
+            self.stderr.write("%s: cycle of main terms" % key)
+        for key in too_deep:
+            self.stderr.write("%s: chain too long" % key)
+        if cycles or too_deep:
+            raise CommandError("%d aliases in cycles, %d too deep." % (len(cycles), len(too_deep)))
+        self.stdout.write("Alias chains are fine.")
@@ -0,0 +1,35 @@
+import sys
+from optparse import make_option
+
+from django.core.management.base import BaseCommand, CommandError
+
+from idioticon.shortcuts import get_term_model
+from idioticon.utils import FORMATS, get_term_fields, guess_format, open_terms_file, write_terms
+
+
+class Command(BaseCommand):
+    args = '[<file>]'
+    help = "Exports all the glossary terms to a CSV or JSON lines file (or to the standard output)."
+
+    option_list = BaseCommand.option_list + (
+        make_option('--format', dest='format', choices=FORMATS,
+                    help="File format (%s), guessed from the extension if omitted." % ', '.join(FORMATS)),
+        make_option('--batch-size', dest='batch_size', type='int', default=500,
+                    help="Number of terms fetched at once."),
+    )
+
+    def handle(self, *args, **options):
+        if len(args) > 1:
+            raise CommandError("Usage: idioticon_export %s" % self.args)
+        filename = args[0] if args else None
+        format = options['format'] or (guess_format(filename) if filename else 'csv')
+        if format is None:
+            raise CommandError("Unable to guess the format of %s, use --format" % filename)
+
+        fields = get_term_fields()
+        rows = get_term_model().objects.iter_values(fields, batch_size=options['batch_size'])
+        if filename is None:
+            write_terms(options.get('stdout', sys.stdout), rows, fields, format)
+        else:
+            with open_terms_file(filename, 'w') as stream:
+                write_terms(stream, rows, fields, format)
@@ -0,0 +1,46 @@
+from optparse import make_option
+
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+
+from idioticon.shortcuts import get_term_model
+from idioticon.utils import FORMATS, get_term_fields, guess_format, open_terms_file, read_terms
+
+
+class Command(BaseCommand):
+    args = '<file>'
+    help = "Imports (creates or updates) glossary terms from a CSV or JSON lines file."
+
+    option_list = BaseCommand.option_list + (
+        make_option('--format', dest='format', choices=FORMATS,
+                    help="File format (%s), guessed from the extension if omitted." % ', '.join(FORMATS)),
+        make_option('--batch-size', dest='batch_size', type='int', default=500,
+                    help="Number of terms written at once."),
+    )
+
+    def handle(self, *args, **options):
+        if len(args) != 1:
+            raise CommandError("Usage: idioticon_import %s" % self.args)
+        filename = args[0]
+        format = options['format'] or guess_format(filename)
+        if format is None:
+            raise CommandError("Unable to guess the format of %s, use --format" % filename)
+
+        with open_terms_file(filename) as stream:
+            try:
+                created, updated = get_term_model().objects.import_terms(
+                    self._validate(read_terms(stream, format)), batch_size=options['batch_size'])
+            except ValidationError as e:
+                raise CommandError('; '.join(e.messages))
+
+        self.stdout.write("%d terms created, %d terms updated." % (created, updated))
+
+    def _validate(self, rows):
+        fields = set(get_term_fields())
+        for line, row in enumerate(rows, 1):
+            unknown = set(row) - fields
+            if unknown:
+                raise CommandError("Unknown term fields at row %d: %s" % (line, ', '.join(sorted(unknown))))
+            if not row.get('key'):
+                raise CommandError("Missing term key at row %d" % line)
+            yield row
@@ -0,0 +1,22 @@
+from optparse import make_option
+
+from django.core.management.base import BaseCommand
+
+from idioticon.shortcuts import get_term_model
+
+
+class Command(BaseCommand):
+    help = "Recomputes the root term of every alias, e.g. after upgrading or bulk writes bypassing Term.save."
+
+    option_list = BaseCommand.option_list + (
+        make_option('--batch-size', dest='batch_size', type='int', default=500,
+                    help="Number of terms updated at once."),
+    )
+
+    def handle(self, *args, **options):
+        manager = get_term_model().objects
+        fixed = manager.rebuild_root_terms(options['batch_size'])
+        if fixed:
+            manager.invalidate_terms(manager.filter(main_term__isnull=False).values_list('key', flat=True),
+                                     options['batch_size'])
+        self.stdout.write("%d root terms fixed." % fixed)
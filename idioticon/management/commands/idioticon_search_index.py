@@ -0,0 +1,18 @@
+from optparse import make_option
+
+from django.core.management.base import BaseCommand
+
+from idioticon.search import install_index
+
+
+class Command(BaseCommand):
+    help = "Creates (or recreates) the full-text search index of the terms, and indexes all of them."
+
+    option_list = BaseCommand.option_list + (
+        make_option('--database', dest='database', default='default',
+                    help="Database to index."),
+    )
+
+    def handle(self, *args, **options):
+        install_index(options['database'])
+        self.stdout.write("Search index rebuilt.")
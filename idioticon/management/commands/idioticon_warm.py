@@ -0,0 +1,18 @@
+from optparse import make_option
+
+from django.core.management.base import BaseCommand
+
+from idioticon.snapshot import warm_cache
+
+
+class Command(BaseCommand):
+    help = "Stores all the terms in the terms cache, e.g. after a deploy."
+
+    option_list = BaseCommand.option_list + (
+        make_option('--batch-size', dest='batch_size', type='int', default=500,
+                    help="Number of terms fetched at once."),
+    )
+
+    def handle(self, *args, **options):
+        count = warm_cache(batch_size=options['batch_size'])
+        self.stdout.write("%d terms cached." % count)
@@ -0,0 +1,81 @@
+"""
+Counters and timings of term lookups and renders.
+
+Metrics are collected only while a collector is active, e.g. during the requests
+processed by ``TermMetricsMiddleware``: otherwise instrumented code pays a single
+thread local lookup. At the end of a request the metrics are sent with the
+``metrics_collected`` signal, logged to the ``idioticon`` logger (DEBUG level) and,
+if ``IDIOTICON_METRICS_HEADER`` is set, added to the response in that header.
+"""
+import threading
+import time
+
+from django.dispatch import Signal
+
+from idioticon import log
+from idioticon.conf import settings
+
+# sent with the metrics of every request
+metrics_collected = Signal(providing_args=['metrics', 'request'])
+
+_local = threading.local()
+
+
+class TermMetrics(object):
+    """Counters of term lookups (cache hits and misses, queries, aliases) and renders."""
+
+    __slots__ = ('lookups', 'cache_hits', 'cache_misses', 'queries', 'alias_hops', 'renders', 'render_time')
+
+    def __init__(self):
+        self.lookups = self.cache_hits = self.cache_misses = self.queries = self.alias_hops = self.renders = 0
+        # seconds
+        self.render_time = 0.0
+
+    def add_lookups(self, terms, hits, queries=0):
+        """Counts the lookup of terms (None if missing), hits of them were found in the cache."""
+        self.lookups += len(terms)
+        self.cache_hits += hits
+        self.cache_misses += len(terms) - hits
+        self.queries += queries
+        self.alias_hops += sum(1 for term in terms if term is not None and term.is_alias)
+
+    def add_render(self, started):
+        """Counts a render started at started (time.time())."""
+        self.renders += 1
+        self.render_time += time.time() - started
+
+    def as_dict(self):
+        return dict((name, getattr(self, name)) for name in self.__slots__)
+
+    def __str__(self):
+        return ' '.join('%s=%.3fms' % (name, value * 1000) if name == 'render_time' else '%s=%d' % (name, value)
+                        for name, value in sorted(self.as_dict().items()))
+
+
+def get_collector():
+    """Returns the metrics being collected in the current thread, or None."""
+    return getattr(_local, 'collector', None)
+
+
+def set_collector(collector):
+    _local.collector = collector
+
+
+class TermMetricsMiddleware(object):
+    """Collects the term metrics of every request."""
+
+    def process_request(self, request):
+        set_collector(TermMetrics())
+
+    def process_response(self, request, response):
+        collector = get_collector()
+        set_collector(None)
+        if collector is not None:
+            metrics_collected.send(sender=self.__class__, metrics=collector, request=request)
+            log.debug("Terms of %s: %s", request.path, collector)
+            if settings.IDIOTICON_METRICS_HEADER:
+                response[settings.IDIOTICON_METRICS_HEADER] = str(collector)
+        return response
+
+    def process_exception(self, request, exception):
+        set_collector(None)
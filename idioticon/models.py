@@ -1,7 +1,26 @@
 # -*- coding: utf-8 -*-
-from django.db import models
-from django.utils.translation import ugettext_lazy as _
+import threading
+
+try:
+    from collections import OrderedDict
+except ImportError:
+    # Python 2.6
+    from django.utils.datastructures import SortedDict as OrderedDict
+
+from django.core.exceptions import ValidationError
+from django.db import connections, models, transaction
+from django.db.models import Q
+from django.db.models.signals import post_save, post_delete
+try:
+    from django.db.models.signals import post_migrate
+except ImportError:
+    # Django < 1.7
+    from django.db.models.signals import post_syncdb as post_migrate
+from django.utils import timezone
+from django.utils.translation import get_language, override, ugettext_lazy as _
 from idioticon.conf import settings
+from idioticon import cache, metrics
+from idioticon.utils import SUMMARY_MAX_LENGTH, chunked, get_field_columns, get_languages, summarize
 
 try:
     # Deprecated in Django 1.7
@@ -15,31 +34,538 @@ except ImportError:
 TermDefinitionField = import_string(settings.IDIOTICON_TEXT_FIELD) if settings.IDIOTICON_TEXT_FIELD else models.TextField
 
 class TermManager(models.Manager):
+    # relations loaded with terms: the first hops of the alias chain and the root term,
+    # so names and definitions are resolved without queries for chains up to 3 hops
+    alias_relations = ('main_term', 'main_term__main_term', 'root_term')
+
+    def get_narrow_queryset(self, fields, language=None):
+        """Returns a queryset of terms, with their alias_relations, loading only
+        the keys and the columns of the given fields in a language.
 
-    def get_term(self, key, soft_error=False):
+        :param fields: term fields, e.g. ('name',)
+        :type fields: tuple
+        :param language: language of the translated fields, the active one if None
+        :type language: str
+        """
+        columns = ['key'] + get_field_columns(fields, language or get_language())
+        return self.get_queryset().select_related(*self.alias_relations).only(
+            *(self.alias_relations + tuple(columns) + tuple('%s__%s' % (relation, column)
+                                                            for relation in self.alias_relations
+                                                            for column in columns)))
+
+    def get_term(self, key, soft_error=False, fields=None, language=None):
         """This method tries to return a term by key.
         Can raise Term.DoesNotExist if soft_error is False (as in default).
 
         :param key: term
         :type key: str
+        :param fields: load only these fields (e.g. ('name',)) in one language,
+                       a cached full term is returned if any
+        :type fields: tuple
+        :param language: language of fields, the active one if None
+        :type language: str
         :returns: then matching Term
         :rtype Term:
         :raises Term.DoesNotExist
         """
         if isinstance(key, Term):
             return key
+        if fields is not None:
+            return self.get_terms([key], soft_error=soft_error, fields=fields, language=language)[key]
+
+        collector = metrics.get_collector()
+        term = cache.get_cached_term(key)
+        if cache.is_missing(term):
+            if collector is not None:
+                collector.add_lookups([None], hits=1)
+            if not soft_error:
+                raise Term.DoesNotExist("Term not found: %s" % key)
+            return None
+        if term is not None:
+            if collector is not None:
+                collector.add_lookups([term], hits=1)
+            return term
 
         try:
-            # use select_related to load main term and requested alias with one query.
-            term = self.get_queryset().select_related('main_term').get(key=key)
+            # use select_related to load main and root terms and requested alias with one query.
+            term = self.get_queryset().select_related(*self.alias_relations).get(key=key)
 
         except Term.DoesNotExist:
+            cache.set_missing_keys([key])
+            if collector is not None:
+                collector.add_lookups([None], hits=0, queries=1)
             if not soft_error:
                 raise
-            term = None
+            return None
 
+        if collector is not None:
+            collector.add_lookups([term], hits=0, queries=1)
+        cache.set_cached_term(term)
         return term
 
+    def get_terms(self, keys, soft_error=False, fields=None, language=None):
+        """This method returns many terms by key, fetching the ones
+        not already cached with a single query.
+        Can raise Term.DoesNotExist if soft_error is False (as in default).
+
+        :param keys: terms
+        :type keys: list of str or Term
+        :param soft_error: map missing keys to None instead of raising
+        :type soft_error: bool
+        :param fields: load only these fields (e.g. ('name',)) in one language,
+                       cached full terms are returned if any
+        :type fields: tuple
+        :param language: language of fields, the active one if None
+        :type language: str
+        :returns: matching Terms by key, in the requested order
+        :rtype: OrderedDict
+        :raises Term.DoesNotExist
+        """
+        keys = list(keys)
+        terms = dict((key.key, key) for key in keys if isinstance(key, Term))
+        keys = [key.key if isinstance(key, Term) else key for key in keys]
+
+        looked_up = set(key for key in keys if key not in terms)
+        cached = cache.get_cached_terms(list(looked_up))
+        terms.update((key, term) for key, term in cached.items() if not cache.is_missing(term))
+
+        missing = set(key for key in looked_up if key not in cached)
+        if missing and fields is not None:
+            columns = get_field_columns(fields, language or get_language())
+            narrow = cache.get_cached_narrow_terms(missing, columns)
+            cached.update(narrow)
+            terms.update(narrow)
+            missing.difference_update(narrow)
+        if missing:
+            # use select_related to load main and root terms and requested aliases with one query.
+            if fields is None:
+                fetched = list(self.get_queryset().select_related(*self.alias_relations).filter(key__in=missing))
+                cache.set_cached_terms(fetched)
+            else:
+                fetched = list(self.get_narrow_queryset(fields, language).filter(key__in=missing))
+                cache.set_cached_narrow_terms(fetched, columns)
+            terms.update((term.key, term) for term in fetched)
+            cache.set_missing_keys(missing.difference(terms))
+
+        collector = metrics.get_collector()
+        if collector is not None:
+            collector.add_lookups([terms.get(key) for key in looked_up], hits=len(cached), queries=int(bool(missing)))
+
+        missing = [key for key in keys if key not in terms]
+        if missing and not soft_error:
+            raise Term.DoesNotExist("Terms not found: %s" % ', '.join(missing))
+
+        return OrderedDict((key, terms.get(key)) for key in keys)
+
+    def get_snapshots(self, keys, soft_error=False):
+        """This method returns the read-only snapshots of many terms by key
+        (see idioticon.snapshot.TermSnapshot), cached apart from the terms.
+        Can raise Term.DoesNotExist if soft_error is False (as in default).
+
+        :param keys: terms
+        :type keys: list of str or Term
+        :param soft_error: map missing keys to None instead of raising
+        :type soft_error: bool
+        :returns: matching TermSnapshots by key, in the requested order
+        :rtype: OrderedDict
+        :raises Term.DoesNotExist
+        """
+        from idioticon.snapshot import TermSnapshot
+        keys = [key.key if isinstance(key, Term) else key for key in keys]
+        looked_up = set(keys)
+        cached = cache.get_cached_snapshots(looked_up)
+        snapshots = dict((key, snapshot) for key, snapshot in cached.items() if not cache.is_missing(snapshot))
+
+        missing = set(key for key in looked_up if key not in cached)
+        if missing:
+            # only the snapshots are cached, not the terms
+            fetched = [TermSnapshot.from_term(term)
+                       for term in self.get_queryset().select_related(*self.alias_relations).filter(key__in=missing)]
+            cache.set_cached_snapshots(fetched)
+            snapshots.update((snapshot.key, snapshot) for snapshot in fetched)
+            cache.set_missing_keys(missing.difference(snapshots), make=cache.make_snapshot_key)
+
+        collector = metrics.get_collector()
+        if collector is not None:
+            collector.add_lookups([snapshots.get(key) for key in looked_up], hits=len(cached),
+                                  queries=int(bool(missing)))
+
+        missing = [key for key in keys if key not in snapshots]
+        if missing and not soft_error:
+            raise Term.DoesNotExist("Terms not found: %s" % ', '.join(missing))
+
+        return OrderedDict((key, snapshots.get(key)) for key in keys)
+
+    def get_aliases(self, term, follow_chain=False):
+        """Returns pk and key of all the aliases resolving through term.
+        Aliases of a main term are found by root term with one query,
+        aliases of an alias following the alias chains (one query per level).
+
+        :param term: main term
+        :type term: Term
+        :param follow_chain: always follow the alias chains, ignoring root terms
+        :type follow_chain: bool
+        :returns: alias pk and key pairs
+        :rtype: list
+        """
+        if term.is_main_term and not follow_chain:
+            return list(self.get_queryset().filter(root_term=term).values_list('pk', 'key'))
+
+        aliases = []
+        seen = set([term.pk])
+        pks = [term.pk]
+        while pks:
+            level = self.get_queryset().filter(main_term__in=pks).values_list('pk', 'key')
+            pks = []
+            for pk, key in level:
+                if pk not in seen:
+                    seen.add(pk)
+                    pks.append(pk)
+                    aliases.append((pk, key))
+        return aliases
+
+    def get_alias_keys(self, term):
+        """Returns the keys of all the aliases resolving through term.
+
+        :param term: main term
+        :type term: Term
+        :returns: alias keys
+        :rtype: set
+        """
+        return set(key for pk, key in self.get_aliases(term))
+
+    def import_terms(self, rows, batch_size=500, create=True):
+        """Upserts terms in batches: new terms are created with bulk_create,
+        existing ones updated with a query each. Alias links are resolved
+        in a second pass, once all the terms exist.
+
+        :param rows: term dicts with a key and any of main_term (the main term key,
+                     empty for main terms), name, definition and their language columns
+        :type rows: iterable
+        :param batch_size: number of terms read and written at once
+        :type batch_size: int
+        :param create: create missing terms, or skip them
+        :type create: bool
+        :returns: numbers of created and updated terms
+        :rtype: tuple
+        :raises ValidationError: if a main term is missing or alias links form a cycle
+        """
+        created = updated = 0
+        keys = []
+        links = {}
+        with transaction.atomic():
+            for batch in chunked(rows, batch_size):
+                batch = OrderedDict((row['key'], row) for row in batch)
+                existing = dict(self.get_queryset().filter(key__in=list(batch)).values_list('key', 'pk'))
+                new_terms = []
+                for key, row in batch.items():
+                    if not create and key not in existing:
+                        continue
+                    values = dict((field, value) for field, value in row.items() if field not in ('key', 'main_term'))
+                    values.update(_summary_values(values))
+                    if 'main_term' in row:
+                        links[key] = row['main_term'] or None
+                    if key in existing:
+                        if values:
+                            self.get_queryset().filter(pk=existing[key]).update(updated_at=timezone.now(), **values)
+                        if values or 'main_term' in row:
+                            updated += 1
+                            keys.append(key)
+                    else:
+                        new_terms.append(self.model(key=key, **values))
+                        keys.append(key)
+                if new_terms:
+                    self.get_queryset().bulk_create(new_terms)
+                created += len(new_terms)
+            if links:
+                self._link_aliases(links, batch_size)
+                self.rebuild_root_terms(batch_size, keys=list(links))
+        self.invalidate_terms(keys, batch_size)
+        return created, updated
+
+    def delete_terms(self, keys, alias_cascade=True, batch_size=500):
+        """Deletes terms with a constant number of queries per batch.
+
+        :param keys: terms
+        :type keys: iterable of str or Term
+        :param alias_cascade: delete the aliases too, otherwise they become main terms
+        :type alias_cascade: bool
+        :param batch_size: number of terms deleted at once
+        :type batch_size: int
+        :returns: number of deleted terms
+        :rtype: int
+        """
+        keys = [key.key if isinstance(key, Term) else key for key in keys]
+        deleted = []
+        detached = []
+        # deleted terms (cascades included) are collected by signals and evicted at once
+        _bulk.deleted = evicted = set()
+        try:
+            with transaction.atomic():
+                for chunk in chunked(keys, batch_size):
+                    targets = Q(key__in=chunk)
+                    aliases = Q(main_term__key__in=chunk) | Q(root_term__key__in=chunk)
+                    if alias_cascade:
+                        targets |= aliases
+                    else:
+                        # detach the aliases, so they are not deleted in cascade
+                        orphans = list(self.get_queryset().filter(aliases).exclude(targets).values_list('pk', 'key'))
+                        if orphans:
+                            orphans = self.get_queryset().filter(pk__in=[pk for pk, key in orphans])
+                            orphans.filter(main_term__key__in=chunk).update(main_term=None, updated_at=timezone.now())
+                            detached.extend(orphans.values_list('key', flat=True))
+                            orphans.update(root_term=None)
+                    queryset = self.get_queryset().filter(targets)
+                    deleted.extend(queryset.values_list('key', flat=True))
+                    queryset.delete()
+                if detached:
+                    self.rebuild_root_terms(batch_size, keys=detached)
+        finally:
+            _bulk.deleted = None
+        self.invalidate_terms(evicted.union(detached), batch_size)
+        return len(deleted)
+
+    def _link_aliases(self, links, batch_size=500):
+        """Sets main terms from a dict of alias key -> main term key (or None)."""
+        main_keys = list(set(key for key in links.values() if key))
+        pks = {}
+        for chunk in chunked(main_keys, batch_size):
+            pks.update(self.get_queryset().filter(key__in=chunk).values_list('key', 'pk'))
+        missing = [key for key in main_keys if key not in pks]
+        if missing:
+            raise ValidationError("Main terms not found: %s" % ', '.join(sorted(missing)))
+
+        aliases_by_main_term = {}
+        for key, main_key in links.items():
+            aliases_by_main_term.setdefault(pks.get(main_key), []).append(key)
+        for main_term, keys in aliases_by_main_term.items():
+            for chunk in chunked(keys, batch_size):
+                self.get_queryset().filter(key__in=chunk).update(main_term=main_term, updated_at=timezone.now())
+
+    def rebuild_root_terms(self, batch_size=500, keys=None):
+        """Recomputes the root term of every term,
+        needed after bulk writes that bypass Term.save.
+
+        :param keys: recompute only these terms and their aliases
+                     (the other terms keep their root term), every term if None
+        :type keys: list
+        :returns: number of fixed terms
+        :rtype: int
+        :raises ValidationError: if alias links form a cycle
+        """
+        columns = ('pk', 'main_term', 'root_term')
+        if keys is None:
+            rows = list(self.get_queryset().values_list(*columns))
+        else:
+            # the terms and their aliases, one query per chain level
+            rows = []
+            for chunk in chunked(keys, batch_size):
+                rows.extend(self.get_queryset().filter(key__in=chunk).values_list(*columns))
+            seen = set(row[0] for row in rows)
+            level = list(seen)
+            while level:
+                found = []
+                for chunk in chunked(level, batch_size):
+                    found.extend(row for row in self.get_queryset().filter(main_term__in=chunk).values_list(*columns)
+                                 if row[0] not in seen)
+                seen.update(row[0] for row in found)
+                rows.extend(found)
+                level = [row[0] for row in found]
+        main_terms = {}
+        root_terms = {}
+        for pk, main_term, root_term in rows:
+            main_terms[pk] = main_term
+            root_terms[pk] = root_term
+
+        # top[pk] is the main term at the top of pk alias chain (pk itself for main terms)
+        top = {}
+        # main terms of the recomputed terms outside of them keep their root term
+        outside = list(set(main_term for main_term in main_terms.values()
+                           if main_term is not None and main_term not in main_terms))
+        for chunk in chunked(outside, batch_size):
+            for pk, main_term, root_term in self.get_queryset().filter(pk__in=chunk).values_list(*columns):
+                top[pk] = pk if main_term is None else root_term
+        for pk in main_terms:
+            path = []
+            node = pk
+            while node not in top:
+                if main_terms[node] is None:
+                    top[node] = node
+                    break
+                if node in path:
+                    raise ValidationError("Alias cycle between terms: %s" % ', '.join(
+                        self.get_queryset().filter(pk__in=path).values_list('key', flat=True)))
+                path.append(node)
+                node = main_terms[node]
+            for alias in path:
+                top[alias] = top[node]
+
+        fixes = {}
+        for pk, main_term in main_terms.items():
+            root_term = top[pk] if main_term is not None else None
+            if root_term != root_terms[pk]:
+                fixes.setdefault(root_term, []).append(pk)
+        for root_term, pks in fixes.items():
+            for chunk in chunked(pks, batch_size):
+                self.get_queryset().filter(pk__in=chunk).update(root_term=root_term, updated_at=timezone.now())
+        return sum(len(pks) for pks in fixes.values())
+
+    def invalidate_terms(self, keys, batch_size=500):
+        """Evicts terms and their aliases from the cache,
+        needed after bulk writes that don't send signals.
+
+        :param keys: changed term keys
+        :type keys: iterable
+        """
+        keys = set(keys)
+        for chunk in chunked(list(keys), batch_size):
+            aliases = self.get_queryset().filter(Q(main_term__key__in=chunk) | Q(root_term__key__in=chunk))
+            keys.update(aliases.values_list('key', flat=True))
+        _forget_terms(keys)
+        cache.invalidate_keys(keys)
+        cache.bump_glossary_version()
+        _prerender_terms(keys, batch_size)
+
+    def iter_terms(self, batch_size=500):
+        """Yields every term, with main and root terms, fetching them in batches
+        ordered by pk, so memory stays flat on large glossaries.
+
+        :param batch_size: number of terms fetched at once
+        :type batch_size: int
+        """
+        queryset = self.get_queryset().select_related(*self.alias_relations).order_by('pk')
+        last = None
+        while True:
+            batch = list((queryset if last is None else queryset.filter(pk__gt=last))[:batch_size])
+            if not batch:
+                return
+            for term in batch:
+                yield term
+            last = batch[-1].pk
+
+    def iter_values(self, fields, batch_size=500):
+        """Yields the values of every term as dicts, fetching them in batches
+        ordered by pk, so memory stays flat on large glossaries.
+        The main_term value is the main term key.
+
+        :param fields: term fields
+        :type fields: list
+        :param batch_size: number of terms fetched at once
+        :type batch_size: int
+        """
+        columns = ['pk'] + ['main_term__key' if field == 'main_term' else field for field in fields]
+        last = None
+        while True:
+            queryset = self.get_queryset().order_by('pk')
+            if last is not None:
+                queryset = queryset.filter(pk__gt=last)
+            batch = list(queryset.values_list(*columns)[:batch_size])
+            if not batch:
+                return
+            for values in batch:
+                yield dict(zip(fields, values[1:]))
+            last = batch[-1][0]
+
+    def search(self, q, language=None):
+        """Returns the terms whose key, name or definition match every word of q,
+        most relevant first (see idioticon.search).
+
+        :param q: search words
+        :type q: str
+        :param language: language of the searched names and definitions, the active one if None
+        :type language: str
+        :rtype: QuerySet
+        """
+        from idioticon.search import search
+        return search(self.get_queryset(), q, language)
+
+    def suggest(self, key, limit=3):
+        """Returns the existing keys most similar to a (missing) key, most similar first
+        (see idioticon.suggest).
+
+        :param key: term key
+        :type key: str
+        :param limit: max number of suggestions
+        :type limit: int
+        :rtype: list
+        """
+        from idioticon.suggest import suggest
+        return suggest(key, limit)
+
+    def _chains_sql(self, where):
+        """Returns a subquery "chain" walking (with a recursive CTE) the main_term chains
+        of the terms matching where, with a row (start_id, id, main_term_id, depth) for every hop.
+        Its parameters are the where ones, then the max depth."""
+        qn = connections[self.db].ops.quote_name
+        table, pk, main_term = qn(self.model._meta.db_table), qn('id'), qn('main_term_id')
+        # path is the list of the visited ids, to stop on cycles
+        # wrapped in a SELECT: some sqlite3 drivers return rows only for statements starting with it
+        return ("(WITH RECURSIVE chain (start_id, id, main_term_id, depth, path) AS ("
+                "SELECT {pk}, {pk}, {main_term}, 0, ',' || CAST({pk} AS TEXT) || ',' FROM {table} WHERE {where} "
+                "UNION ALL "
+                "SELECT chain.start_id, term.{pk}, term.{main_term}, chain.depth + 1, "
+                "chain.path || CAST(term.{pk} AS TEXT) || ',' "
+                "FROM chain JOIN {table} term ON term.{pk} = chain.main_term_id "
+                "WHERE chain.depth < %s AND chain.path NOT LIKE '%%,' || CAST(term.{pk} AS TEXT) || ',%%') "
+                "SELECT start_id, id, main_term_id, depth FROM chain) chain ").format(
+            table=table, pk=pk, main_term=main_term, where=where)
+
+    def resolve_roots(self, keys, max_depth=None, batch_size=500):
+        """Returns the root term of every key following the main_term chains,
+        with a recursive query (one per batch of keys), whatever root_term says.
+
+        :param keys: terms
+        :type keys: list of str or Term
+        :param max_depth: longest chain followed, IDIOTICON_MAX_ALIAS_DEPTH if None
+        :type max_depth: int
+        :param batch_size: number of keys resolved at once
+        :type batch_size: int
+        :returns: root Terms by key (the term itself for main terms), None for missing keys
+                  and keys whose chain is a cycle or longer than max_depth
+        :rtype: OrderedDict
+        """
+        max_depth = settings.IDIOTICON_MAX_ALIAS_DEPTH if max_depth is None else max_depth
+        keys = list(OrderedDict((getattr(key, 'key', key), None) for key in keys))
+        qn = connections[self.db].ops.quote_name
+        table, pk, key = qn(self.model._meta.db_table), qn('id'), qn('key')
+        roots = {}
+        for chunk in chunked(keys, batch_size):
+            sql = "SELECT root.*, start.{key} AS idioticon_start_key FROM ".format(key=key) + self._chains_sql(
+                '%s IN (%s)' % (key, ', '.join(['%s'] * len(chunk)))) + (
+                "JOIN {table} root ON root.{pk} = chain.id JOIN {table} start ON start.{pk} = chain.start_id "
+                "WHERE chain.main_term_id IS NULL").format(table=table, pk=pk)
+            for root in self.raw(sql, list(chunk) + [max_depth]):
+                roots[root.idioticon_start_key] = root
+        return OrderedDict((key, roots.get(key)) for key in keys)
+
+    def check_alias_chains(self, max_depth=None):
+        """Finds the aliases whose main_term chain is a cycle (or leads to one),
+        or is longer than max_depth, with a recursive query over the whole table.
+
+        :param max_depth: longest chain allowed, IDIOTICON_MAX_ALIAS_DEPTH if None
+        :type max_depth: int
+        :returns: keys of the aliases in cycles, and of the ones too deep
+        :rtype: tuple
+        """
+        max_depth = settings.IDIOTICON_MAX_ALIAS_DEPTH if max_depth is None else max_depth
+        qn = connections[self.db].ops.quote_name
+        table, pk, key = qn(self.model._meta.db_table), qn('id'), qn('key')
+        sql = ("SELECT start.{key}, MAX(chain.depth), "
+               "MAX(CASE WHEN chain.main_term_id IS NULL THEN 1 ELSE 0 END) FROM ").format(key=key) + self._chains_sql(
+            '%s IS NOT NULL' % qn('main_term_id')) + (
+            "JOIN {table} start ON start.{pk} = chain.start_id GROUP BY start.{key} "
+            "ORDER BY start.{key}").format(table=table, pk=pk, key=key)
+        cursor = connections[self.db].cursor()
+        # one more hop to tell chains max_depth long from longer ones
+        cursor.execute(sql, [max_depth + 1])
+        cycles, too_deep = [], []
+        for start, depth, rooted in cursor.fetchall():
+            if depth > max_depth:
+                too_deep.append(start)
+            elif not rooted:
+                cycles.append(start)
+        return cycles, too_deep
+
     def add_alias(self, term, alias, name='', definition=''):
         """Adds an Alias to main term.
 
@@ -79,26 +605,119 @@ class Term(models.Model):
                            help_text=_("A single word, to use as key in popovers' inclusion tags"))
     name = models.CharField(_("Term"), blank=True, max_length=255, help_text=_("The term"))
     definition = TermDefinitionField(_("Definition"), blank=True, help_text=_("The definition of the term"))
+    # plain text of the definition for tooltips, maintained on save
+    summary = models.CharField(_("Summary"), blank=True, editable=False, max_length=SUMMARY_MAX_LENGTH)
 
     main_term = models.ForeignKey('self', null=True, blank=True, related_name='aliases',
                                   help_text=_("Main definition"))
+    # the main term at the top of the alias chain, maintained on save
+    root_term = models.ForeignKey('self', null=True, blank=True, editable=False, related_name='+')
+    updated_at = models.DateTimeField(_("Last update"), auto_now=True)
 
     objects = TermManager()
 
+    def get_root_term(self):
+        """Returns the main term this alias resolves to, or None for main terms."""
+        if self.is_main_term:
+            return None
+        if self.root_term_id:
+            return self.root_term
+        return self.main_term
+
+    def get_root_key(self):
+        """Returns the key of the main term this alias resolves to, or None for main terms."""
+        root_term = self.get_root_term()
+        return root_term.key if root_term is not None else None
+
+    def iter_chain(self):
+        """Yields the term and the terms of its alias chain, up to the main term,
+        jumping to the loaded root term at the last hop."""
+        term, seen = self, set()
+        while term is not None and term.pk not in seen:
+            yield term
+            seen.add(term.pk)
+            if term.main_term_id is None:
+                return
+            if self.root_term_id is not None and term.main_term_id == self.root_term_id:
+                term = self.root_term
+            else:
+                term = term.main_term
+
     def get_name(self):
-        if self.name:
-            return self.name
-        if self.is_alias:
-            return self.main_term.get_name()
-        return self.key
+        """Returns the name of the nearest term of the alias chain having one, or the main term key."""
+        for term in self.iter_chain():
+            if term.name:
+                return term.name
+        return term.key
 
     def get_definition(self):
-        if self.definition:
-            return self.definition
-        if self.is_alias:
-            return self.main_term.get_definition()
+        """Returns the definition of the nearest term of the alias chain having one."""
+        for term in self.iter_chain():
+            if term.definition:
+                return term.definition
+        return ''
+
+    def get_summary(self):
+        """Returns the plain text summary of the definition, as get_definition resolves it."""
+        for term in self.iter_chain():
+            if term.definition:
+                # terms saved before summaries existed
+                return term.summary or summarize(term.definition)
         return ''
 
+    def update_summary(self):
+        """Summarizes the definition in every language."""
+        for language in get_languages():
+            with override(language):
+                self.summary = summarize(self.definition)
+
+    def get_updated_at(self):
+        """Returns the last update of the term, or of the alias chain terms it inherits from."""
+        return max(term.updated_at for term in self.iter_chain())
+
+    def resolve_root_term(self):
+        """Finds the root of the alias chain through main term.
+
+        :returns: the root term, or None for main terms
+        :rtype: Term
+        :raises ValidationError: if the alias chain is a cycle
+        """
+        if self.main_term_id is None:
+            return None
+        # follow the stored chain above the new main term: the term must not be in it
+        seen = set([self.pk]) if self.pk is not None else set()
+        root_term = self.main_term
+        while root_term.pk not in seen and root_term.is_alias:
+            seen.add(root_term.pk)
+            root_term = root_term.main_term
+        if root_term.pk in seen:
+            raise ValidationError(_("A term cannot be an alias of itself or of its aliases."))
+        return root_term
+
+    def clean(self):
+        self.resolve_root_term()
+
+    def save(self, *args, **kwargs):
+        stored = None
+        if self.pk is not None:
+            stored = list(Term.objects.filter(pk=self.pk).values_list('key', 'main_term')[:1])
+            stored = stored[0] if stored else None
+        # keep track of the stored key, so a renamed term can be evicted
+        self._cached_key = stored[0] if stored else None
+
+        self.root_term = self.resolve_root_term()
+        self.update_summary()
+        super(Term, self).save(*args, **kwargs)
+
+        if stored and stored[1] != self.main_term_id:
+            # re-parented: move the whole alias subtree under the new root
+            aliases = Term.objects.get_aliases(self, follow_chain=True)
+            if aliases:
+                Term.objects.filter(pk__in=[pk for pk, key in aliases]).update(
+                    root_term=self.root_term or self, updated_at=self.updated_at)
+                cache.invalidate_keys(key for pk, key in aliases)
+                _prerender_terms([key for pk, key in aliases])
+
     def add_alias(self, key, name='', description=''):
         return self.objects.add_alias(self, key, name, description)
 
@@ -107,7 +726,7 @@ class Term(models.Model):
 
     @property
     def is_main_term(self):
-        return self.main_term is None
+        return self.main_term_id is None
 
     @property
     def is_alias(self):
@@ -117,3 +736,71 @@ class Term(models.Model):
         verbose_name = _("Term")
         verbose_name_plural = _("Terms")
 
+
+def _summary_values(values):
+    """Returns the summary columns of the definition columns in values."""
+    return dict(('summary' + field[len('definition'):], summarize(value))
+                for field, value in values.items() if field == 'definition' or field.startswith('definition_'))
+
+
+# bulk writes of the current thread
+_bulk = threading.local()
+
+
+def _forget_terms(keys):
+    """Drops changed terms from the lazy terms registry of the current request,
+    and the glossary snapshot of the process."""
+    from idioticon.lazy import get_registry
+    from idioticon.snapshot import drop_snapshot
+    registry = get_registry()
+    if registry is not None:
+        registry.forget(keys)
+    drop_snapshot()
+
+
+def _prerender_terms(keys, batch_size=500):
+    """Renders changed terms with the IDIOTICON_PRERENDER_THEMES, once evicted."""
+    if settings.IDIOTICON_PRERENDER_THEMES:
+        from idioticon.templatetags.idioticon import prerender_terms
+        for chunk in chunked(list(keys), batch_size):
+            terms = Term.objects.get_terms(chunk, soft_error=True)
+            prerender_terms([term for term in terms.values() if term is not None])
+
+
+def _invalidate_saved_term(sender, instance, **kwargs):
+    """Evicts a term and every alias resolving through it from the cache."""
+    keys = set([instance.key, getattr(instance, '_cached_key', None)])
+    keys.discard(None)
+    keys.update(sender.objects.get_alias_keys(instance))
+    _forget_terms(keys)
+    cache.invalidate_keys(keys)
+    cache.bump_glossary_version()
+    _prerender_terms(keys)
+
+
+def _invalidate_deleted_term(sender, instance, **kwargs):
+    """Evicts a term from the cache, its aliases are deleted in cascade and evicted by their own signal."""
+    deleted = getattr(_bulk, 'deleted', None)
+    if deleted is not None:
+        # evicted at once by delete_terms
+        deleted.add(instance.key)
+        return
+    _forget_terms([instance.key])
+    cache.invalidate_keys([instance.key])
+    cache.bump_glossary_version()
+
+
+post_save.connect(_invalidate_saved_term, sender=Term, dispatch_uid='idioticon_invalidate_on_save')
+post_delete.connect(_invalidate_deleted_term, sender=Term, dispatch_uid='idioticon_invalidate_on_delete')
+
+
+def _install_search_index(sender, using='default', **kwargs):
+    """Installs the full-text index once the terms table exists."""
+    # an AppConfig since Django 1.7, the models module before
+    label = getattr(sender, 'label', None) or sender.__name__.split('.')[-2]
+    if label == Term._meta.app_label:
+        from idioticon.search import install_index
+        install_index(using)
+
+
+post_migrate.connect(_install_search_index, dispatch_uid='idioticon_install_search_index')
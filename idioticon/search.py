@@ -0,0 +1,198 @@
+"""
+Full-text search over term key, name and definition, in every language.
+
+The index is maintained by the database itself, so bulk writes keep it up to date:
+
+* SQLite uses an external content FTS5 table, kept in sync by triggers;
+* PostgreSQL uses a GIN expression index over ``to_tsvector`` for each language,
+  with the text search configuration set in ``IDIOTICON_SEARCH_CONFIGS``
+  (e.g. ``{'it': 'italian'}``, ``'simple'`` by default).
+
+Other databases, and SQLite builds without FTS5, fall back to ``icontains`` lookups.
+The index is installed after syncdb/migrate, or with the ``idioticon_search_index`` command.
+"""
+import re
+
+from django.db import DatabaseError, connections
+from django.db.models import Q
+from django.utils.translation import get_language
+
+from idioticon import log
+from idioticon.conf import settings
+from idioticon.utils import get_languages, get_language_fields
+
+WORD_RE = re.compile(r'\w+', re.UNICODE)
+CONFIG_RE = re.compile(r'^\w+$')
+
+# whether the SQLite FTS5 index exists, by database alias
+_sqlite_indexes = {}
+
+
+def get_terms_table():
+    from idioticon.models import Term
+    return Term._meta.db_table
+
+
+class FallbackBackend(object):
+
+    def __init__(self, connection):
+        self.connection = connection
+
+    def install(self):
+        pass
+
+    def is_installed(self):
+        return True
+
+    def search(self, queryset, words, language):
+        """Returns the terms matching all the words, sorted by relevance when supported."""
+        for word in words:
+            query = Q(key__icontains=word)
+            for field in get_language_fields(language):
+                query |= Q(**{'%s__icontains' % field: word})
+            queryset = queryset.filter(query)
+        return queryset
+
+
+class SQLiteBackend(FallbackBackend):
+
+    def get_index_table(self):
+        return '%s_fts' % get_terms_table()
+
+    def is_installed(self):
+        alias = self.connection.alias
+        if alias not in _sqlite_indexes:
+            cursor = self.connection.cursor()
+            cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = %s",
+                           [self.get_index_table()])
+            _sqlite_indexes[alias] = cursor.fetchone() is not None
+        return _sqlite_indexes[alias]
+
+    def get_columns(self):
+        columns = ['key']
+        for language in get_languages():
+            columns.extend(field for field in get_language_fields(language) if field not in columns)
+        return columns
+
+    def install(self):
+        quote = self.connection.ops.quote_name
+        table, index = quote(get_terms_table()), quote(self.get_index_table())
+        columns = ', '.join(quote(column) for column in self.get_columns())
+        new = ', '.join('new.%s' % quote(column) for column in self.get_columns())
+        old = ', '.join('old.%s' % quote(column) for column in self.get_columns())
+        name = self.get_index_table()
+        cursor = self.connection.cursor()
+        for trigger in ('ai', 'ad', 'au'):
+            cursor.execute('DROP TRIGGER IF EXISTS %s' % quote('%s_%s' % (name, trigger)))
+        cursor.execute('DROP TABLE IF EXISTS %s' % index)
+        try:
+            cursor.execute("CREATE VIRTUAL TABLE %s USING fts5(%s, content=%s, content_rowid='id')" % (
+                index, columns, table.replace('"', "'")))
+        except DatabaseError:
+            # SQLite built without FTS5
+            log.warning("Unable to create the full-text index, searching with plain lookups", exc_info=True)
+            _sqlite_indexes[self.connection.alias] = False
+            return
+        cursor.execute('CREATE TRIGGER %s AFTER INSERT ON %s BEGIN '
+                       'INSERT INTO %s(rowid, %s) VALUES (new.id, %s); END' % (
+                           quote(name + '_ai'), table, index, columns, new))
+        cursor.execute('CREATE TRIGGER %s AFTER DELETE ON %s BEGIN '
+                       "INSERT INTO %s(%s, rowid, %s) VALUES ('delete', old.id, %s); END" % (
+                           quote(name + '_ad'), table, index, index, columns, old))
+        cursor.execute('CREATE TRIGGER %s AFTER UPDATE ON %s BEGIN '
+                       "INSERT INTO %s(%s, rowid, %s) VALUES ('delete', old.id, %s); "
+                       'INSERT INTO %s(rowid, %s) VALUES (new.id, %s); END' % (
+                           quote(name + '_au'), table, index, index, columns, old, index, columns, new))
+        cursor.execute("INSERT INTO %s(%s) VALUES ('rebuild')" % (index, index))
+        _sqlite_indexes[self.connection.alias] = True
+
+    def search(self, queryset, words, language):
+        quote = self.connection.ops.quote_name
+        index = quote(self.get_index_table())
+        columns = ['key'] + get_language_fields(language)
+        # every word as a quoted prefix, in the language columns only
+        match = '{%s} : (%s)' % (' '.join(columns), ' '.join('"%s"*' % word for word in words))
+        # joined once, the rank comes with the matching rows
+        return queryset.extra(
+            select={'search_rank': '%s.rank' % index},
+            tables=[self.get_index_table()],
+            where=['%s.rowid = %s.id' % (index, quote(get_terms_table())), '%s MATCH %%s' % index],
+            params=(match,),
+        ).order_by('search_rank')
+
+
+class PostgreSQLBackend(FallbackBackend):
+
+    def get_config(self, language):
+        config = settings.IDIOTICON_SEARCH_CONFIGS.get(language, 'simple')
+        if not CONFIG_RE.match(config):
+            raise ValueError("Invalid text search configuration: %r" % config)
+        return config
+
+    def get_document(self, language):
+        """Returns the indexed expression of a language (queries must use the same)."""
+        quote = self.connection.ops.quote_name
+        columns = ['key'] + get_language_fields(language)
+        return "to_tsvector('%s'::regconfig, %s)" % (
+            self.get_config(language), " || ' ' || ".join("coalesce(%s, '')" % quote(column) for column in columns))
+
+    def install(self):
+        quote = self.connection.ops.quote_name
+        cursor = self.connection.cursor()
+        for language in get_languages():
+            index = quote('%s_search_%s' % (get_terms_table(), re.sub(r'\W', '_', language)))
+            cursor.execute('DROP INDEX IF EXISTS %s' % index)
+            cursor.execute('CREATE INDEX %s ON %s USING GIN (%s)' % (
+                index, quote(get_terms_table()), self.get_document(language)))
+
+    def search(self, queryset, words, language):
+        document = self.get_document(language)
+        query = "to_tsquery('%s'::regconfig, %%s)" % self.get_config(language)
+        # every word as a prefix
+        terms = ' & '.join("'%s':*" % word for word in words)
+        return queryset.extra(
+            select={'search_rank': 'ts_rank(%s, %s)' % (document, query)},
+            select_params=(terms,),
+            where=['%s @@ %s' % (document, query)],
+            params=(terms,),
+        ).order_by('-search_rank')
+
+
+BACKENDS = {
+    'sqlite': SQLiteBackend,
+    'postgresql': PostgreSQLBackend,
+}
+
+
+def get_backend(using='default', installed=True):
+    """
+    Returns the search backend of a database.
+
+    :param installed: fall back to plain lookups if the index isn't installed
+    :type installed: bool
+    """
+    connection = connections[using]
+    backend = BACKENDS.get(connection.vendor, FallbackBackend)(connection)
+    if installed and not backend.is_installed():
+        return FallbackBackend(connection)
+    return backend
+
+
+def install_index(using='default'):
+    """Creates (or recreates) the full-text index, indexing all the terms."""
+    get_backend(using, installed=False).install()
+
+
+def search(queryset, q, language=None):
+    """
+    Returns the terms of queryset matching every word of q, most relevant first.
+
+    :param q: search words
+    :type q: str
+    :param language: language of the searched names and definitions, the active one if None
+    :type language: str
+    """
+    words = WORD_RE.findall(q or '')
+    if not words:
+        return queryset.none()
+    return get_backend(queryset.db).search(queryset, words, language or get_language())
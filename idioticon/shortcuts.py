@@ -1,11 +1,26 @@
 
 
+from idioticon.conf import settings
+
+
 def get_term_model():
     from idioticon.models import Term
     return Term
 
 
-def get_term(key, resolve_alias=True, soft_error=True):
+def _get_registry(lazy):
+    if not lazy:
+        return None
+    from idioticon.lazy import get_registry
+    return get_registry()
+
+
+def _get_snapshot():
+    from idioticon.snapshot import get_snapshot
+    return get_snapshot()
+
+
+def get_term(key, resolve_alias=True, soft_error=True, lazy=False, fields=None, language=None):
     """
     Retrieve a term by key.
     This is a shortcut to use Term.objects (TermManager).
@@ -16,11 +31,59 @@ def get_term(key, resolve_alias=True, soft_error=True):
     :type resolve_alias: bool
     :param soft_error:
     :type soft_error: bool
-    :return: a required Term or None if soft_error is True and key not found.
+    :param lazy: return a proxy resolved in batch on first use, during a request
+                 processed by TermRegistryMiddleware (a missing term is a falsy proxy)
+    :type lazy: bool
+    :param fields: load only these fields (e.g. ('name',)) in one language, see TermManager.get_term
+    :type fields: tuple
+    :param language: language of fields, the active one if None
+    :type language: str
+    :return: a required Term (a TermSnapshot with IDIOTICON_TERM_SNAPSHOTS)
+             or None if soft_error is True and key not found.
+             With IDIOTICON_SNAPSHOT the term is shared by all the threads of the process:
+             don't change it, use set_term and update_term.
     :rtype: Term or bool
     :raises Term.DoesNotExist
     """
-    return get_term_model().objects.get_term(key, soft_error=soft_error)
+    registry = _get_registry(lazy)
+    if registry is not None:
+        return registry.get_lazy(key)
+    snapshot = _get_snapshot()
+    if snapshot is not None:
+        return snapshot.get_term(key, soft_error=soft_error)
+    if settings.IDIOTICON_TERM_SNAPSHOTS and fields is None:
+        return get_term_model().objects.get_snapshots([key], soft_error=soft_error)[getattr(key, 'key', key)]
+    return get_term_model().objects.get_term(key, soft_error=soft_error, fields=fields, language=language)
+
+
+def get_terms(keys, soft_error=True, lazy=False, fields=None, language=None):
+    """
+    Retrieve many terms by key with a single query.
+    This is a shortcut to use Term.objects (TermManager).
+
+    :param keys:
+    :type keys: list of Term or str
+    :param soft_error:
+    :type soft_error: bool
+    :param lazy: return proxies resolved in batch on first use (see get_term)
+    :type lazy: bool
+    :param fields: load only these fields in one language (see get_term)
+    :type fields: tuple
+    :param language: language of fields, the active one if None
+    :type language: str
+    :return: requested Terms (or TermSnapshots, see get_term) by key (None for missing keys if soft_error is True).
+    :rtype: OrderedDict
+    :raises Term.DoesNotExist
+    """
+    registry = _get_registry(lazy)
+    if registry is not None:
+        return registry.get_lazy_terms(keys)
+    snapshot = _get_snapshot()
+    if snapshot is not None:
+        return snapshot.get_terms(keys, soft_error=soft_error)
+    if settings.IDIOTICON_TERM_SNAPSHOTS and fields is None:
+        return get_term_model().objects.get_snapshots(keys, soft_error=soft_error)
+    return get_term_model().objects.get_terms(keys, soft_error=soft_error, fields=fields, language=language)
 
 
 def add_term(key, name='', definition=''):
@@ -45,6 +108,18 @@ def add_term(key, name='', definition=''):
     return term
 
 
+def _get_stored_term(key):
+    """Returns a term read from the database, or None: terms about to be written
+    aren't read from the cache or the snapshot, where they may be stale or shared."""
+    Term = get_term_model()
+    if isinstance(key, Term):
+        return key
+    try:
+        return Term.objects.select_related(*Term.objects.alias_relations).get(key=getattr(key, 'key', key))
+    except Term.DoesNotExist:
+        return None
+
+
 def set_term(key, name=None, definition=None):
     """
     Set a term parameters if already exists or add it.
@@ -58,7 +133,7 @@ def set_term(key, name=None, definition=None):
     :return: updated or added Term
     :rtype: Term
     """
-    term = get_term(key, soft_error=True)
+    term = _get_stored_term(key)
     if term is None:
         term = add_term(key)
     if name is not None:
@@ -82,7 +157,7 @@ def update_term(key, name=None, definition=None):
     :return: updated Term or False
     :rtype: Term or bool
     """
-    term = get_term(key, soft_error=True)
+    term = _get_stored_term(key)
     if term is None:
         return False
     if name is not None:
@@ -104,7 +179,7 @@ def delete_term(key, alias_cascade=True):
     :return: deleted Term or False
     :rtype: bool or Term
     """
-    term = get_term(key, soft_error=True)
+    term = _get_stored_term(key)
     if term is None:
         return False
 
@@ -117,6 +192,67 @@ def delete_term(key, alias_cascade=True):
     return term
 
 
+def _term_rows(terms):
+    for term in terms:
+        if isinstance(term, dict):
+            yield term
+        else:
+            yield {'key': getattr(term, 'key', term)}
+
+
+def set_terms(terms, batch_size=500):
+    """
+    Set many terms parameters, adding the missing terms.
+    Terms are fetched, created and updated in batches.
+
+    :param terms: keys, or dicts with a key and the new parameters
+                  (name, definition, main_term key)
+    :type terms: iterable of str or dict
+    :param batch_size: number of terms written at once
+    :type batch_size: int
+    :return: created, updated and deleted terms counts
+    :rtype: dict
+    :raises ValidationError: if a main term is missing or alias links form a cycle
+    """
+    created, updated = get_term_model().objects.import_terms(_term_rows(terms), batch_size=batch_size)
+    return {'created': created, 'updated': updated, 'deleted': 0}
+
+
+def update_terms(terms, batch_size=500):
+    """
+    Update many terms parameters, only for already existing terms.
+
+    :param terms: dicts with a key and the new parameters
+                  (name, definition, main_term key)
+    :type terms: iterable of dict
+    :param batch_size: number of terms written at once
+    :type batch_size: int
+    :return: created, updated and deleted terms counts
+    :rtype: dict
+    :raises ValidationError: if a main term is missing or alias links form a cycle
+    """
+    created, updated = get_term_model().objects.import_terms(
+        _term_rows(terms), batch_size=batch_size, create=False)
+    return {'created': created, 'updated': updated, 'deleted': 0}
+
+
+def delete_terms(keys, alias_cascade=True, batch_size=500):
+    """
+    Delete many terms with their aliases.
+
+    :param keys:
+    :type keys: iterable of Term or str
+    :param alias_cascade: Remove all linked aliases, otherwise they become main terms
+    :type alias_cascade: bool
+    :param batch_size: number of terms deleted at once
+    :type batch_size: int
+    :return: created, updated and deleted terms counts
+    :rtype: dict
+    """
+    deleted = get_term_model().objects.delete_terms(keys, alias_cascade=alias_cascade, batch_size=batch_size)
+    return {'created': 0, 'updated': 0, 'deleted': deleted}
+
+
 def add_alias(term, alias, name='', definition=''):
     """
     Adds an alias Term to term.
@@ -133,7 +269,7 @@ def add_alias(term, alias, name='', definition=''):
     :rtype: Term or bool
     :raises Term.DoesNotExist
     """
-    term = get_term(term, soft_error=True)
+    term = _get_stored_term(term)
     if term is None:
         return False
     return get_term_model().objects.add_alias(term, alias, name, definition)
\ No newline at end of file
@@ -0,0 +1,222 @@
+"""
+Glossary warm-up and in-process snapshot.
+
+With ``IDIOTICON_SNAPSHOT`` enabled, every process keeps the whole glossary in
+a snapshot (a dict of terms by key, never changed once built), and the read
+shortcuts (``get_term``, ``get_terms``, hence template tags) are served from it
+with plain dict lookups.
+The snapshot is tagged with the glossary version of the shared cache, bumped
+on any term write: the version is checked at most every
+``IDIOTICON_SNAPSHOT_INTERVAL`` seconds, and when it changed one thread loads
+a fresh snapshot and swaps it in, while the others keep using the cache.
+Writes made by the process itself drop its snapshot at once.
+
+Without ``IDIOTICON_TERM_SNAPSHOTS`` the snapshot holds Term instances, shared
+by all the threads: callers must never change the terms they get (e.g. to save
+them), or every other thread would see the change. ``set_term`` and the other
+write shortcuts read the terms from the database, not from the snapshot.
+With ``IDIOTICON_TERM_SNAPSHOTS`` the snapshot holds read-only TermSnapshots.
+
+``IDIOTICON_SNAPSHOT_ON_READY`` loads the snapshot when the app is ready,
+and the ``idioticon_warm`` command fills the shared cache after a deploy.
+"""
+import threading
+import time
+
+from idioticon import cache, metrics, shortcuts
+from django.utils.translation import get_language, override
+
+from idioticon.conf import settings
+from idioticon.config import PY3
+from idioticon.utils import chunked, get_languages, summarize
+
+try:
+    from collections import OrderedDict
+except ImportError:
+    # Python 2.6
+    from django.utils.datastructures import SortedDict as OrderedDict
+
+
+class TermSnapshot(object):
+    """
+    Read-only copy of a term, with name, definition and summary resolved in every language.
+
+    It's much lighter than a Term to keep in memory and to pickle, and has the
+    interface used by templates: ``key``, ``get_name``, ``get_definition``,
+    ``get_summary``, ``is_alias``, ``is_main_term``, ``get_root_key`` and ``get_updated_at``.
+    """
+    __slots__ = ('key', 'languages', 'names', 'definitions', 'root_key', 'updated_at', 'summaries')
+
+    def __init__(self, key, languages, names, definitions, root_key=None, updated_at=None, summaries=None):
+        if summaries is None:
+            summaries = [summarize(definition) for definition in definitions]
+        values = (key, tuple(languages), tuple(names), tuple(definitions), root_key, updated_at, tuple(summaries))
+        for name, value in zip(self.__slots__, values):
+            object.__setattr__(self, name, value)
+
+    @classmethod
+    def from_term(cls, term, languages=None):
+        """Returns the snapshot of a term, in the glossary languages if None."""
+        languages = languages or get_languages()
+        names, definitions, summaries = [], [], []
+        for language in languages:
+            with override(language):
+                names.append(term.get_name())
+                definitions.append(term.get_definition())
+                summaries.append(term.get_summary())
+        root_key = term.get_root_key() if term.is_alias else None
+        return cls(term.key, languages, names, definitions, root_key, term.get_updated_at(), summaries)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("TermSnapshot is read-only")
+
+    def __reduce__(self):
+        return self.__class__, tuple(getattr(self, name) for name in self.__slots__)
+
+    def __eq__(self, other):
+        return isinstance(other, TermSnapshot) and \
+            all(getattr(self, name) == getattr(other, name) for name in self.__slots__)
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __hash__(self):
+        return hash(self.key)
+
+    def __repr__(self):
+        return '<TermSnapshot: %s>' % self.key
+
+    def __unicode__(self):
+        return self.get_name()
+
+    def __str__(self):
+        return self.get_name() if PY3 else self.get_name().encode('utf-8')
+
+    def _get_index(self, language):
+        language = language or get_language() or ''
+        for candidate in (language, language.split('-')[0]):
+            if candidate in self.languages:
+                return self.languages.index(candidate)
+        return 0
+
+    def get_name(self, language=None):
+        return self.names[self._get_index(language)]
+
+    def get_definition(self, language=None):
+        return self.definitions[self._get_index(language)]
+
+    def get_summary(self, language=None):
+        return self.summaries[self._get_index(language)]
+
+    def get_root_key(self):
+        return self.root_key
+
+    def get_updated_at(self):
+        return self.updated_at
+
+    @property
+    def is_alias(self):
+        return self.root_key is not None
+
+    @property
+    def is_main_term(self):
+        return self.root_key is None
+
+
+class GlossarySnapshot(object):
+    """All the terms (or TermSnapshots, with IDIOTICON_TERM_SNAPSHOTS) of a glossary version, by key.
+    The terms are shared by all the threads and must not be changed."""
+
+    def __init__(self, version, terms):
+        self.version = version
+        self.terms = terms
+
+    def get_term(self, key, soft_error=True):
+        """See shortcuts.get_term."""
+        key = getattr(key, 'key', key)
+        term = self.terms.get(key)
+        collector = metrics.get_collector()
+        if collector is not None:
+            collector.add_lookups([term], hits=1)
+        if term is None and not soft_error:
+            raise shortcuts.get_term_model().DoesNotExist("Term not found: %s" % key)
+        return term
+
+    def get_terms(self, keys, soft_error=True):
+        """See shortcuts.get_terms."""
+        keys = [getattr(key, 'key', key) for key in keys]
+        terms = OrderedDict((key, self.terms.get(key)) for key in keys)
+        collector = metrics.get_collector()
+        if collector is not None:
+            collector.add_lookups(list(terms.values()), hits=len(terms))
+        missing = [key for key, term in terms.items() if term is None]
+        if missing and not soft_error:
+            raise shortcuts.get_term_model().DoesNotExist("Terms not found: %s" % ', '.join(missing))
+        return terms
+
+
+# snapshot of this process, and time its version was last checked
+_snapshot = None
+_checked = [0]
+_lock = threading.Lock()
+
+
+def build_snapshot(batch_size=500):
+    """Loads all the terms, with main and root terms, in a new snapshot."""
+    # read before loading: writes made meanwhile make the snapshot stale
+    version = cache.get_glossary_version()
+    terms = shortcuts.get_term_model().objects.iter_terms(batch_size)
+    if settings.IDIOTICON_TERM_SNAPSHOTS:
+        languages = get_languages()
+        terms = (TermSnapshot.from_term(term, languages) for term in terms)
+    return GlossarySnapshot(version, dict((term.key, term) for term in terms))
+
+
+def load_snapshot(batch_size=500):
+    """Builds a snapshot of the current glossary and swaps it in."""
+    global _snapshot
+    snapshot = build_snapshot(batch_size)
+    _snapshot, _checked[0] = snapshot, time.time()
+    return snapshot
+
+
+def drop_snapshot():
+    global _snapshot
+    _snapshot = None
+
+
+def get_snapshot(load=True):
+    """
+    Returns the snapshot of the current glossary version,
+    or None if snapshots are disabled or another thread is loading it.
+
+    :param load: load the snapshot if missing or stale, or return None
+    :type load: bool
+    """
+    if not settings.IDIOTICON_SNAPSHOT:
+        return None
+    snapshot = _snapshot
+    now = time.time()
+    if snapshot is not None and now - _checked[0] < settings.IDIOTICON_SNAPSHOT_INTERVAL:
+        return snapshot
+    if snapshot is not None and snapshot.version == cache.get_glossary_version():
+        _checked[0] = now
+        return snapshot
+    if not load or not _lock.acquire(False):
+        return None
+    try:
+        return load_snapshot()
+    finally:
+        _lock.release()
+
+
+def warm_cache(batch_size=500):
+    """Stores all the terms, and their IDIOTICON_PRERENDER_THEMES renders,
+    in the shared cache, returns their number."""
+    from idioticon.templatetags.idioticon import prerender_terms
+    count = 0
+    for batch in chunked(shortcuts.get_term_model().objects.iter_terms(batch_size), batch_size):
+        cache.set_cached_terms(batch)
+        prerender_terms(batch)
+        count += len(batch)
+    return count
@@ -0,0 +1,145 @@
+"""
+"Did you mean" suggestions for missing term keys.
+
+Keys are matched by trigram similarity with an in-memory inverted index
+of all the term keys, built on first use and rebuilt only when the glossary
+version changes.
+Missing keys met while rendering never build the index: without a current one,
+they are reported when the request finishes.
+"""
+import threading
+from heapq import nlargest
+
+from django.core.signals import request_finished
+
+from idioticon import cache, log, shortcuts
+
+# keys less similar than this are never suggested (Jaccard index of the trigrams)
+MIN_SIMILARITY = 0.25
+
+# keys scored per suggestion, among those sharing most trigrams
+CANDIDATES_FACTOR = 10
+
+# max number of missing keys waiting for the index
+MAX_PENDING = 1000
+
+# (glossary version, index)
+_index = None
+
+# missing keys to report when the request finishes
+_pending = set()
+_pending_lock = threading.Lock()
+
+
+def get_trigrams(key):
+    """Returns the set of trigrams of a key, padded so short keys have some."""
+    key = ' %s ' % key.lower()
+    return set(key[i:i + 3] for i in range(len(key) - 2))
+
+
+class TrigramIndex(object):
+
+    def __init__(self, keys):
+        self.keys = []
+        self.sizes = []
+        self.postings = {}
+        # missing keys already reported
+        self.reported = set()
+        for key in keys:
+            trigrams = get_trigrams(key)
+            for trigram in trigrams:
+                self.postings.setdefault(trigram, []).append(len(self.keys))
+            self.keys.append(key)
+            self.sizes.append(len(trigrams))
+
+    def suggest(self, key, limit=3, min_similarity=MIN_SIMILARITY):
+        """Returns up to limit keys similar to key, most similar first."""
+        trigrams = get_trigrams(key)
+        # shared trigrams by key index
+        shared = {}
+        for trigram in trigrams:
+            for index in self.postings.get(trigram, ()):
+                shared[index] = shared.get(index, 0) + 1
+        size = len(trigrams)
+        scored = []
+        # only the keys sharing most trigrams can be the most similar
+        for index, count in nlargest(limit * CANDIDATES_FACTOR, shared.items(), key=lambda item: item[1]):
+            similarity = float(count) / (size + self.sizes[index] - count)
+            if similarity >= min_similarity and self.keys[index] != key:
+                scored.append((-similarity, self.keys[index]))
+        scored.sort()
+        return [suggestion for _, suggestion in scored[:limit]]
+
+
+def get_index():
+    """Returns the index of the glossary keys, building it if the glossary changed."""
+    global _index
+    version = cache.get_glossary_version()
+    built = _index
+    if built is None or built[0] != version:
+        keys = shortcuts.get_term_model().objects.values_list('key', flat=True).iterator()
+        built = _index = (version, TrigramIndex(keys))
+    return built[1]
+
+
+def suggest(key, limit=3):
+    """
+    Returns the existing keys closest to key, most similar first.
+
+    :param key: term key
+    :type key: str
+    :param limit: max number of suggestions
+    :type limit: int
+    :rtype: list
+    """
+    return get_index().suggest(key, limit)
+
+
+def get_current_index():
+    """Returns the index of the glossary keys if it is up to date, or None."""
+    built = _index
+    if built is None or built[0] != cache.get_glossary_version():
+        return None
+    return built[1]
+
+
+def report_missing(key):
+    """
+    Logs a missing key with its suggestions, once per glossary version.
+
+    Without a current index the key is reported by ``report_pending``,
+    so rendering never waits for the index to be built.
+    """
+    index = get_current_index()
+    if index is None:
+        with _pending_lock:
+            if len(_pending) < MAX_PENDING:
+                _pending.add(key)
+        return
+    _report(index, key)
+
+
+def report_pending(**kwargs):
+    """Logs the missing keys waiting for the index, building it if needed."""
+    if not _pending:
+        return
+    with _pending_lock:
+        keys = list(_pending)
+        _pending.clear()
+    index = get_index()
+    for key in keys:
+        _report(index, key)
+
+
+def _report(index, key):
+    if key in index.reported:
+        return
+    index.reported.add(key)
+    suggestions = index.suggest(key)
+    if suggestions:
+        log.warning("Term %r not found, did you mean %s?", key, ', '.join(repr(s) for s in suggestions))
+    else:
+        log.warning("Term %r not found", key)
+
+
+request_finished.connect(report_pending, dispatch_uid='idioticon_report_missing_terms')
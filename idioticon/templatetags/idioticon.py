@@ -1,43 +1,224 @@
 from __future__ import absolute_import
+import time
 from django import template
 from django.conf import settings
-from django.template import (Node, TemplateSyntaxError, Context)
+from django.template import (Node, TemplateSyntaxError, Context, Variable)
+try:
+    from django.template.library import parse_bits
+except ImportError:
+    # Django < 1.9
+    from django.template.base import parse_bits
 from django.template.loader import get_template
-from idioticon import shortcuts
+from django.utils.html import conditional_escape
+from django.utils.safestring import mark_safe
+from django.utils.translation import get_language, override
+from idioticon import autolink, bundle, cache, lazy, log, metrics, shortcuts, suggest
+from idioticon.config import string_types
+from idioticon.utils import get_languages
 
 
 register = template.Library()
 
+# render_context key holding the terms prefetched during a render
+PREFETCHED_TERMS = 'idioticon_terms'
+
+
+def unquote(value):
+    if len(value) > 1 and value[0] == value[-1] and value[0] in ('"', "'"):
+        return value[1:-1]
+    return value
+
+
+def get_template_keys(parser):
+    """
+    Returns the set of literal term keys used by the template being compiled.
+    The same set is shared by every term node of the template.
+    """
+    if not hasattr(parser, 'idioticon_keys'):
+        parser.idioticon_keys = set()
+    return parser.idioticon_keys
+
+
+def prefetch_terms(context, keys):
+    """
+    Resolves all the given keys not already prefetched during this render
+    with a single query, and returns the prefetched terms by key.
+    """
+    terms = context.render_context.get(PREFETCHED_TERMS)
+    if terms is None:
+        terms = context.render_context[PREFETCHED_TERMS] = {}
+    missing = [key for key in keys if key not in terms]
+    if missing:
+        terms.update(shortcuts.get_terms(missing))
+    return terms
+
+
+def get_prefetched_term(context, keys, key):
+    registry = lazy.get_registry()
+    if registry is not None:
+        # batch with all the terms used during the request
+        registry.prefetch(keys)
+        return registry.resolve(key)
+    terms = prefetch_terms(context, keys)
+    if key in terms:
+        return terms[key]
+    return shortcuts.get_term(key)
+
+
 class LoadTermsNode(Node):
-    def __init__(self, variables, terms):
+    def __init__(self, variables, terms, template_keys=()):
         self.variables = variables
         self.terms = terms
+        self.template_keys = template_keys
 
     def render(self, context):
+        collector = metrics.get_collector()
+        started = time.time() if collector is not None else None
+        registry = lazy.get_registry()
+        if registry is not None:
+            # resolved on first use, in batch with all the terms used during the request
+            registry.prefetch(self.template_keys)
+            terms = registry.get_lazy_terms(self.terms)
+        else:
+            terms = prefetch_terms(context, set(self.template_keys).union(self.terms))
         for variable, term in zip(self.variables, self.terms):
-            context[variable] = shortcuts.get_term(term)
+            context[variable] = terms[term]
+            if registry is None and terms[term] is None:
+                suggest.report_missing(term)
+        if collector is not None:
+            collector.add_render(started)
         return ''
 
 
-@register.simple_tag(name="term_tag")
+class TermNode(Node):
+    def __init__(self, term_key, kwargs, template_keys=()):
+        self.term_key = term_key
+        self.kwargs = kwargs
+        self.template_keys = template_keys
+
+    def render(self, context):
+        key = self.term_key.resolve(context)
+        kwargs = dict((k, v.resolve(context)) for k, v in self.kwargs.items())
+        return render_term(key, lambda: get_prefetched_term(context, self.template_keys, key), **kwargs)
+
+
 def do_term_tag(term_key, **kwargs):
+    return render_term(term_key, lambda: shortcuts.get_term(term_key), **kwargs)
 
-    theme = kwargs.pop('theme', settings.IDIOTICON_THEME)
 
-    context = Context()
-    context.update(kwargs)
+# compiled theme templates, by name
+_templates = {}
+
+
+def get_theme_template(theme):
+    template_name = 'idioticon/term_%s.html' % theme
+    if template_name not in _templates:
+        _templates[template_name] = get_template(template_name)
+    return _templates[template_name]
+
+
+def get_fragment_variant(theme, kwargs):
+    """
+    Returns the fragment cache variant of a rendering,
+    or None if options can't be part of a cache key.
+    """
+    options = sorted(kwargs.items())
+    for name, value in options:
+        if value is not None and not isinstance(value, string_types + (int, float, bool)):
+            return None
+    return theme, get_language(), tuple(options)
+
+
+def render_term(term_key, resolve_term, **kwargs):
+    """
+    Renders a term with a theme template.
+    The html is served from the fragment cache when possible,
+    so the term is resolved only on cache misses.
+    """
+    collector = metrics.get_collector()
+    if collector is not None:
+        started = time.time()
+        try:
+            return _render_term(term_key, resolve_term, **kwargs)
+        finally:
+            collector.add_render(started)
+    return _render_term(term_key, resolve_term, **kwargs)
+
+
+def _render_term(term_key, resolve_term, **kwargs):
+    theme = kwargs.pop('theme', settings.IDIOTICON_THEME)
+    key = getattr(term_key, 'key', term_key)
+    variant = get_fragment_variant(theme, kwargs)
 
     try:
-        context['term'] = shortcuts.get_term(term_key)
-        template_name = 'idioticon/term_%s.html' % theme
-        template = get_template(template_name)
-        return template.render(context)
-    except:
+        if variant is not None:
+            html = cache.get_cached_fragment(key, variant)
+            if html is not None:
+                return html
+
+        context = Context()
+        context.update(kwargs)
+        context['term'] = resolve_term()
+        if context['term'] is None:
+            suggest.report_missing(key)
+        html = get_theme_template(theme).render(context)
+
+        if variant is not None and context['term'] is not None:
+            cache.set_cached_fragment(key, variant, html)
+        return html
+
+    except Exception:
         if settings.TEMPLATE_DEBUG:
             raise
+        log.exception("Unable to render term %r with theme %r", key, theme)
         return ''
 
 
+def prerender_terms(terms):
+    """
+    Renders terms with every IDIOTICON_PRERENDER_THEMES theme in every glossary
+    language, and stores the html in the fragment cache, where term tags
+    without options find it without resolving the terms.
+
+    :param terms: terms, with main and root terms
+    :type terms: list of Term
+    """
+    themes = settings.IDIOTICON_PRERENDER_THEMES
+    if not themes or not terms or cache.get_cache() is None:
+        return
+    fragments = dict((term.key, {}) for term in terms)
+    for language in get_languages():
+        with override(language):
+            for theme in themes:
+                template = get_theme_template(theme)
+                variant = get_fragment_variant(theme, {})
+                for term in terms:
+                    fragments[term.key][variant] = template.render(Context({'term': term}))
+    cache.set_cached_fragments(fragments)
+
+
+@register.tag("term_tag")
+def do_term(parser, token):
+    """
+    This will render a term with the configured theme.
+
+    Usage::
+
+        {% term_tag 'my-term' %}
+        {% term_tag 'my-term' theme='abbr' %}
+
+    Literal keys are collected while compiling the template, and all of them
+    are resolved with a single query the first time a term tag is rendered.
+    """
+    bits = token.split_contents()[1:]
+    args, kwargs = parse_bits(parser, bits, ['term_key'], None, 'kwargs', None, False, 'term_tag')
+    term_key = args[0]
+    template_keys = get_template_keys(parser)
+    if not term_key.filters and not isinstance(term_key.var, Variable):
+        template_keys.add(term_key.var)
+    return TermNode(term_key, kwargs, template_keys)
+
+
 @register.tag("load_terms")
 def do_load_terms(parser, token):
     """
@@ -57,8 +238,40 @@ def do_load_terms(parser, token):
     except ValueError:
         raise TemplateSyntaxError("'load_terms' requires '*terms as *variable' (got %r)" % args)
 
-    names, terms = args[as_index+1:], args[1:as_index]
+    names, terms = args[as_index+1:], [unquote(term) for term in args[1:as_index]]
 
     if len(names) != len(terms):
         raise TemplateSyntaxError("'load_terms' requires '*terms as *variable' (got %r)" % args)
-    return LoadTermsNode(names, terms)
\ No newline at end of file
+    template_keys = get_template_keys(parser)
+    template_keys.update(terms)
+    return LoadTermsNode(names, terms, template_keys)
+
+
+@register.filter(name="idioticonize", needs_autoescape=True)
+def do_idioticonize(value, theme=None, autoescape=None):
+    """
+    This will wrap every glossary term found in a text with its theme.
+
+    Usage::
+
+        {{ article.body|idioticonize }}
+        {{ article.body|idioticonize:'abbr' }}
+
+    """
+    if autoescape:
+        value = conditional_escape(value)
+    return autolink.idioticonize(mark_safe(value), theme=theme)
+
+
+@register.simple_tag(name="glossary_bundle_url")
+def do_glossary_bundle_url(language=None):
+    """
+    This will output the url of the static glossary bundle
+    of the active language (written by the idioticon_bundle command).
+
+    Usage::
+
+        <script>var glossaryUrl = '{% glossary_bundle_url %}';</script>
+
+    """
+    return bundle.get_bundle_url(language) or ''
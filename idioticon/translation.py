@@ -2,6 +2,6 @@ from modeltranslation.translator import translator, TranslationOptions
 from idioticon.models import Term
 
 class TermTranslationOptions(TranslationOptions):
-    fields = ('name', 'definition',)
+    fields = ('name', 'definition', 'summary',)
 
 translator.register(Term, TermTranslationOptions)
\ No newline at end of file
@@ -0,0 +1,9 @@
+from django.conf.urls import url
+
+from idioticon.views import GlossaryView, SearchView, TermsView
+
+urlpatterns = [
+    url(r'^$', GlossaryView.as_view(), name='idioticon_glossary'),
+    url(r'^terms\.json$', TermsView.as_view(), name='idioticon_terms'),
+    url(r'^search\.json$', SearchView.as_view(), name='idioticon_search'),
+]
@@ -0,0 +1,185 @@
+"""
+Helpers to stream terms in and out of the glossary (CSV and JSON lines).
+"""
+import csv
+import io
+import json
+import re
+from itertools import islice
+
+from django.utils.html import strip_tags
+from django.utils.text import Truncator
+
+from idioticon.config import PY3, unicode
+
+try:
+    from html import unescape
+except ImportError:
+    # Python 2
+    from HTMLParser import HTMLParser
+    unescape = HTMLParser().unescape
+
+FORMATS = ('csv', 'jsonl')
+
+# length of the summary column of Term
+SUMMARY_MAX_LENGTH = 255
+
+
+def chunked(iterable, size):
+    """Yields lists of at most size items from iterable."""
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def _get_translation_languages():
+    """Returns the translated fields of Term and the languages of django-modeltranslation,
+    or None if Term isn't registered for translation."""
+    try:
+        from modeltranslation.translator import translator, NotRegistered
+        from modeltranslation.settings import AVAILABLE_LANGUAGES
+    except ImportError:
+        return None
+    from idioticon.models import Term
+    try:
+        options = translator.get_options_for_model(Term)
+    except NotRegistered:
+        return None
+    return sorted(options.fields), list(AVAILABLE_LANGUAGES)
+
+
+def get_localized_fields():
+    """
+    Returns the language columns added by django-modeltranslation to Term
+    (e.g. name_en, definition_en), or an empty list if it isn't used.
+    """
+    translation = _get_translation_languages()
+    if translation is None:
+        return []
+    from modeltranslation.utils import build_localized_fieldname
+    fields, languages = translation
+    return [build_localized_fieldname(field, language) for field in fields for language in languages]
+
+
+def get_language_fields(language=None):
+    """
+    Returns the name and definition columns of Term in a language,
+    the default one if language is None or not translated.
+    """
+    translation = _get_translation_languages()
+    if translation is None:
+        return ['name', 'definition']
+    from modeltranslation.utils import build_localized_fieldname
+    fields, languages = translation
+    if language not in languages:
+        language = (language or '').split('-')[0]
+    if language not in languages:
+        language = languages[0]
+    return [build_localized_fieldname(field, language) if field in fields else field
+            for field in ('name', 'definition')]
+
+
+def get_field_columns(fields, language=None):
+    """
+    Returns the columns holding Term fields in a language: the language column
+    and the default language one (the modeltranslation fallback) for translated fields,
+    the field itself for the others.
+    """
+    translation = _get_translation_languages()
+    if translation is None:
+        return list(fields)
+    from modeltranslation.utils import build_localized_fieldname
+    translated, languages = translation
+    language_fields = dict(zip(('name', 'definition'), get_language_fields(language)))
+    columns = []
+    for field in fields:
+        if field in translated:
+            columns.append(language_fields[field])
+            columns.append(build_localized_fieldname(field, languages[0]))
+        else:
+            columns.append(field)
+    return sorted(set(columns), key=columns.index)
+
+
+def get_languages():
+    """Returns the languages of the glossary: the django-modeltranslation ones, or the default one."""
+    translation = _get_translation_languages()
+    if translation is None:
+        from django.conf import settings
+        return [settings.LANGUAGE_CODE]
+    return translation[1]
+
+
+def summarize(definition, length=None):
+    """
+    Returns the plain text of a (possibly rich text) definition,
+    with collapsed whitespace and truncated to length characters
+    (IDIOTICON_SUMMARY_LENGTH if None, at most SUMMARY_MAX_LENGTH), e.g. for tooltips.
+    """
+    from idioticon.conf import settings
+    length = min(settings.IDIOTICON_SUMMARY_LENGTH if length is None else length, SUMMARY_MAX_LENGTH)
+    text = re.sub(r'\s+', ' ', unescape(strip_tags(unicode(definition or '')))).strip()
+    return Truncator(text).chars(length)
+
+
+def get_term_fields():
+    """Returns the columns of an exported term, key first."""
+    return ['key', 'main_term', 'name', 'definition'] + get_localized_fields()
+
+
+def guess_format(filename):
+    for format in FORMATS:
+        if filename.endswith('.' + format):
+            return format
+    return None
+
+
+def open_terms_file(filename, mode='r'):
+    """Opens a terms file for reading ('r') or writing ('w'), as expected by the csv module."""
+    if PY3:
+        return io.open(filename, mode, encoding='utf-8', newline='')
+    return open(filename, mode + 'b')
+
+
+def read_terms(stream, format):
+    """
+    Yields a dict for every term read from stream.
+    The main_term value is the main term key, empty for main terms.
+    """
+    if format == 'jsonl':
+        for line in stream:
+            if isinstance(line, bytes):
+                line = line.decode('utf-8')
+            if line.strip():
+                yield json.loads(line)
+    else:
+        reader = csv.reader(stream)
+        header = None
+        for row in reader:
+            if not PY3:
+                row = [value.decode('utf-8') for value in row]
+            if header is None:
+                header = row
+                continue
+            yield dict(zip(header, row))
+
+
+def write_terms(stream, rows, fields, format):
+    """Writes term dicts to stream, with the given columns."""
+    if format == 'jsonl':
+        for row in rows:
+            line = json.dumps(dict((field, row[field]) for field in fields), ensure_ascii=False) + '\n'
+            if not PY3 and isinstance(line, unicode):
+                line = line.encode('utf-8')
+            stream.write(line)
+    else:
+        writer = csv.writer(stream)
+        writer.writerow(fields)
+        for row in rows:
+            values = [row[field] if row[field] is not None else '' for field in fields]
+            if not PY3:
+                values = [unicode(value).encode('utf-8') for value in values]
+            writer.writerow(values)
@@ -0,0 +1,182 @@
+import hashlib
+import json
+
+from django.http import Http404, HttpResponse, HttpResponseBadRequest
+from django.utils.cache import patch_cache_control
+from django.utils.decorators import method_decorator
+from django.utils.translation import get_language
+from django.views.decorators.http import condition
+from django.views.generic import TemplateView, View
+
+from idioticon import cache
+from idioticon.shortcuts import get_term_model, get_terms
+
+# bucket of the keys not starting with a letter
+OTHER_LETTER = '#'
+
+
+def get_letter(key):
+    letter = key[:1].upper()
+    return letter if letter.isalpha() else OTHER_LETTER
+
+
+def get_letter_counts():
+    """
+    Returns the number of terms by initial letter, sorted by letter.
+    Counts are computed once per glossary version and kept in the cache.
+    """
+    version = cache.get_glossary_version()
+    cached = cache.get_cached_value('letters')
+    if cached is not None and cached[0] == version:
+        return cached[1]
+
+    counts = {}
+    for key in get_term_model().objects.values_list('key', flat=True).iterator():
+        letter = get_letter(key)
+        counts[letter] = counts.get(letter, 0) + 1
+    counts = sorted(counts.items())
+    cache.set_cached_value('letters', (version, counts))
+    return counts
+
+
+class GlossaryView(TemplateView):
+    """
+    Lists the glossary terms ordered by key, paginated by key
+    (``?after=<key>`` and ``?before=<key>``) instead of offset,
+    so every page costs the same however deep it is.
+    The list can be filtered by initial letter with ``?letter=<letter>``.
+    """
+    template_name = 'idioticon/glossary.html'
+    paginate_by = 50
+
+    def get_queryset(self):
+        # only the displayed columns of terms and of their alias chains
+        fields = ('key', 'name', 'definition')
+        relations = get_term_model().objects.alias_relations
+        return get_term_model().objects.select_related(*relations).only(
+            *(relations + fields + tuple('%s__%s' % (relation, field)
+                                         for relation in relations
+                                         for field in fields)))
+
+    def get_page(self, queryset):
+        """Returns the terms of the page, and whether there are previous and next pages."""
+        after, before = self.request.GET.get('after'), self.request.GET.get('before')
+        if before:
+            terms = list(queryset.filter(key__lt=before).order_by('-key')[:self.paginate_by + 1])
+            has_previous, has_next = len(terms) > self.paginate_by, True
+            terms = terms[:self.paginate_by][::-1]
+        else:
+            if after:
+                queryset = queryset.filter(key__gt=after)
+            terms = list(queryset.order_by('key')[:self.paginate_by + 1])
+            has_previous, has_next = bool(after), len(terms) > self.paginate_by
+            terms = terms[:self.paginate_by]
+        return terms, has_previous, has_next
+
+    def get_context_data(self, **kwargs):
+        context = super(GlossaryView, self).get_context_data(**kwargs)
+        queryset = self.get_queryset()
+
+        letters = get_letter_counts()
+        letter = self.request.GET.get('letter', '').upper()
+        if letter:
+            if letter not in dict(letters):
+                raise Http404("No terms starting with %s" % letter)
+            if letter == OTHER_LETTER:
+                queryset = queryset.exclude(key__regex=r'^[a-zA-Z]')
+            else:
+                queryset = queryset.filter(key__istartswith=letter)
+
+        terms, has_previous, has_next = self.get_page(queryset)
+        context.update({
+            'terms': terms,
+            'letters': letters,
+            'letter': letter,
+            'has_previous': has_previous and bool(terms),
+            'has_next': has_next and bool(terms),
+            'previous_key': terms[0].key if terms else None,
+            'next_key': terms[-1].key if terms else None,
+        })
+        return context
+
+
+def serialize_term(term):
+    """Returns a term or a term snapshot (or None) as a JSON serializable dict, alias resolved."""
+    if term is None:
+        return None
+    return {
+        'key': term.key,
+        'name': term.get_name(),
+        'definition': term.get_definition(),
+        'main_term': term.get_root_key(),
+    }
+
+
+def _get_requested_terms(request):
+    """Returns the terms requested with ?keys=a,b,c (resolved once per request)."""
+    if not hasattr(request, '_idioticon_terms'):
+        keys = [key for key in request.GET.get('keys', '').split(',') if key]
+        request._idioticon_terms = get_terms(keys[:TermsView.max_keys]) if keys else {}
+    return request._idioticon_terms
+
+
+def _terms_last_modified(request):
+    terms = [term for term in _get_requested_terms(request).values() if term is not None]
+    if terms:
+        return max(term.get_updated_at() for term in terms)
+    return None
+
+
+def _terms_etag(request):
+    signature = [get_language() or '']
+    for key, term in _get_requested_terms(request).items():
+        signature.append('%s:%s' % (key, term.get_updated_at().isoformat() if term is not None else ''))
+    return hashlib.md5('|'.join(signature).encode('utf-8')).hexdigest()
+
+
+class TermsView(View):
+    """
+    Returns the terms requested with ``?keys=a,b,c`` as JSON, with aliases
+    resolved (missing keys are null).
+    Responses carry an ETag and a Last-Modified header from the terms last update,
+    so conditional requests are answered with 304 straight from the terms cache.
+    """
+    max_keys = 100
+    max_age = 60
+
+    @method_decorator(condition(etag_func=_terms_etag, last_modified_func=_terms_last_modified))
+    def get(self, request, *args, **kwargs):
+        keys = [key for key in request.GET.get('keys', '').split(',') if key]
+        if not keys:
+            return HttpResponseBadRequest("Missing keys")
+        if len(keys) > self.max_keys:
+            return HttpResponseBadRequest("Too many keys (max %d)" % self.max_keys)
+
+        data = dict((key, self.serialize(term)) for key, term in _get_requested_terms(request).items())
+        response = HttpResponse(json.dumps(data), content_type='application/json')
+        patch_cache_control(response, public=True, max_age=self.max_age)
+        return response
+
+    def serialize(self, term):
+        return serialize_term(term)
+
+
+class SearchView(View):
+    """
+    Returns the terms matching ``?q=<words>`` in the active language as JSON,
+    most relevant first.
+    """
+    max_results = 20
+    max_age = 60
+
+    def get(self, request, *args, **kwargs):
+        q = request.GET.get('q', '').strip()
+        if not q:
+            return HttpResponseBadRequest("Missing q")
+
+        manager = get_term_model().objects
+        terms = manager.search(q).select_related(*manager.alias_relations)[:self.max_results]
+        data = {'q': q, 'terms': [serialize_term(term) for term in terms]}
+        response = HttpResponse(json.dumps(data), content_type='application/json')
+        patch_cache_control(response, public=True, max_age=self.max_age)
+        return response
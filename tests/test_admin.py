@@ -0,0 +1,52 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+test_admin
+----------
+
+Tests for `idioticon` admin module.
+"""
+import mock
+from django.contrib.admin import site
+from django.test import RequestFactory
+
+from idioticon.admin import TermAdmin, TermInline
+from tests.utils import TermTestCase
+
+
+class TestIdioticonAdmin(TermTestCase):
+
+    def setUp(self):
+        super(TestIdioticonAdmin, self).setUp()
+        self.term = self.manager.create(key='budget', name='Budget')
+        for i in range(25):
+            self.manager.create(key='alias-%02d' % i, main_term=self.term)
+        self.admin = TermAdmin(self.manager.model, site)
+
+    def test_changelist_queryset(self):
+        queryset = self.admin.get_queryset(RequestFactory().get('/')).select_related(*self.admin.list_select_related)
+        with self.assertNumQueries(1):
+            rows = dict((term.key, (self.admin.main_term_key(term), self.admin.alias_count(term)))
+                        for term in queryset)
+        self.assertEqual(('', 25), rows['budget'])
+        self.assertEqual(('budget', 0), rows['alias-03'])
+
+    def test_search(self):
+        queryset, distinct = self.admin.get_search_results(
+            RequestFactory().get('/'), self.admin.get_queryset(RequestFactory().get('/')), 'budget')
+        self.assertEqual(['budget'], [term.key for term in queryset])
+
+    def test_empty_search(self):
+        queryset = self.admin.get_queryset(RequestFactory().get('/'))
+        self.assertEqual((queryset, False), self.admin.get_search_results(RequestFactory().get('/'), queryset, ''))
+        self.assertEqual(26, self.admin.get_search_results(RequestFactory().get('/'), queryset, ' - ')[0].count())
+
+    def test_paginated_aliases(self):
+        inline = TermInline(self.manager.model, site)
+        request = RequestFactory().get('/', {'aliases_page': '2'})
+        request.user = mock.Mock(**{'has_perm.return_value': True})
+        formset_class = inline.get_formset(request, self.term)
+        formset = formset_class(instance=self.term)
+        self.assertEqual(['alias-%02d' % i for i in range(20, 25)], [form.instance.key for form in formset.initial_forms])
+        self.assertEqual([1, 2], formset.get_pages())
+        self.assertEqual(25, formset.total)
@@ -0,0 +1,119 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+test_aio
+--------
+
+Tests for `idioticon` aio module (Python 3.5+).
+"""
+import sys
+import unittest
+import mock
+
+from idioticon import shortcuts
+from tests.utils import BudgetTestCase, TermTestCase
+
+
+def run_inline(func, *args, **kwargs):
+    # the in-memory test database is not shared with executor threads
+    import asyncio
+    future = asyncio.Future()
+    future.set_result(func(*args, **kwargs))
+    return future
+
+
+@unittest.skipIf(sys.version_info < (3, 5), "async shortcuts require Python 3.5+")
+class TestIdioticonAsyncShortcuts(BudgetTestCase):
+
+    def setUp(self):
+        super(TestIdioticonAsyncShortcuts, self).setUp()
+        import asyncio
+        from idioticon import aio
+        self.aio = aio
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+        self.patch = mock.patch('idioticon.aio.run_sync', new=mock.Mock(side_effect=run_inline))
+        self.run_sync = self.patch.start()
+
+    def tearDown(self):
+        self.patch.stop()
+        self.loop.close()
+        super(TestIdioticonAsyncShortcuts, self).tearDown()
+
+    def _run(self, coroutine):
+        return self.loop.run_until_complete(coroutine)
+
+    def test_aget_terms(self):
+        import asyncio
+        terms, term = self._run(asyncio.gather(
+            self.aio.aget_terms(['budget', 'bilancio', 'missing']),
+            self.aio.aget_term('bilancio'),
+        ))
+        # concurrent lookups never fetch the same key twice
+        fetched = [key for call in self.run_sync.call_args_list for key in call[0][1]]
+        self.assertEqual(sorted(['budget', 'bilancio', 'missing']), sorted(fetched))
+        self.assertEqual(['budget', 'bilancio', 'missing'], list(terms.keys()))
+        self.assertEqual('Budget', term.get_name())
+        self.assertEqual(None, terms['missing'])
+
+        with self.assertNumQueries(0):
+            self.assertEqual('Money plan', self._run(self.aio.aget_term('bilancio')).get_definition())
+        self.assertRaises(shortcuts.get_term_model().DoesNotExist,
+                          self._run, self.aio.aget_term('missing', soft_error=False))
+
+    def test_async_writes(self):
+        self.assertTrue(self._run(self.aio.aadd_term('new-term', 'New term')))
+        self.assertEqual('Newer term', self._run(self.aio.aset_term('new-term', 'Newer term')).name)
+        self.assertFalse(self._run(self.aio.aupdate_term('missing', 'Missing')))
+        self.assertTrue(self._run(self.aio.aadd_alias('new-term', 'new-alias')))
+        self.assertEqual('Newer term', self._run(self.aio.aget_term('new-alias')).get_name())
+        self._run(self.aio.adelete_term('new-term'))
+        self.assertEqual(None, self._run(self.aio.aget_term('new-alias')))
+
+
+@unittest.skipIf(sys.version_info < (3, 5), "async shortcuts require Python 3.5+")
+class TestIdioticonAsyncExecutor(TermTestCase):
+
+    def setUp(self):
+        super(TestIdioticonAsyncExecutor, self).setUp()
+        import asyncio
+        from idioticon import aio
+        self.aio = aio
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+
+    def tearDown(self):
+        self.loop.close()
+        super(TestIdioticonAsyncExecutor, self).tearDown()
+
+    def test_inflight_lookups(self):
+        import asyncio
+        import threading
+        import time
+        threads = []
+
+        def get_terms(keys, soft_error=True):
+            # the in-memory test database is not shared with executor threads
+            threads.append(threading.current_thread())
+            time.sleep(0.05)
+            return dict((key, None) for key in keys)
+
+        def get_cached_terms(keys):
+            # a remote cache is read in a thread too
+            threads.append(threading.current_thread())
+            return {}
+
+        with mock.patch.object(self.manager, 'get_terms', side_effect=get_terms) as fetch, \
+                mock.patch('idioticon.cache.get_cached_terms', side_effect=get_cached_terms), \
+                mock.patch('idioticon.aio.is_local_cache', return_value=False):
+            results = self.loop.run_until_complete(asyncio.gather(
+                self.aio.aget_terms(['a', 'b']),
+                self.aio.aget_terms(['b', 'c']),
+                self.aio.aget_term('a'),
+            ))
+        self.assertEqual([None, None], list(results[0].values()))
+        self.assertEqual(None, results[2])
+        fetched = [key for call in fetch.call_args_list for key in call[0][0]]
+        self.assertEqual(['a', 'b', 'c'], sorted(fetched))
+        self.assertEqual(5, len(threads))
+        self.assertNotIn(threading.current_thread(), threads)
@@ -0,0 +1,67 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+test_autolink
+-------------
+
+Tests for `idioticon` autolink and automaton modules.
+"""
+import unittest
+from django.template import Template, Context
+
+from idioticon import shortcuts, cache
+from idioticon.automaton import Automaton
+from idioticon.autolink import idioticonize
+from tests.utils import BudgetTestCase
+
+
+class TestIdioticonAutomaton(unittest.TestCase):
+
+    def test_find_all(self):
+        automaton = Automaton([('he', 1), ('she', 2), ('his', 3), ('hers', 4)])
+        self.assertEqual([(0, 2, 1), (2, 6, 4)], automaton.find_all('hehers'))
+        self.assertEqual([(1, 4, 2), (7, 10, 3)], automaton.find_all('ushers his'))
+        self.assertEqual([], automaton.find_all('nothing'))
+
+    def test_find_all_accept(self):
+        automaton = Automaton([('cat', 1), ('cats', 2)])
+
+        def words_only(text, start, end):
+            return end == len(text) or text[end] == ' '
+        self.assertEqual([(4, 7, 1)], automaton.find_all('cat cat', words_only)[1:])
+        self.assertEqual([], automaton.find_all('catsup', words_only))
+
+
+class TestIdioticonAutolink(BudgetTestCase):
+
+    def setUp(self):
+        super(TestIdioticonAutolink, self).setUp()
+        self.manager.create(key='fiscal-year', name='Fiscal year', definition='Accounting period')
+
+    def test_idioticonize(self):
+        self.assertEqual(
+            '<p><abbr title="Money plan">budget</abbr> of the '
+            '<abbr title="Accounting period">Fiscal Year</abbr>, <em><abbr title="Money plan">bilancio</abbr></em></p>',
+            idioticonize('<p>budget of the Fiscal Year, <em>bilancio</em></p>', theme='abbr'))
+
+    def test_fragments_not_cached(self):
+        idioticonize('budget, Budget and BUDGET')
+        with self.assertNumQueries(0):
+            output = idioticonize('budget, Budget and BUDGET', theme='abbr')
+        self.assertEqual(3, output.count('<abbr title="Money plan">'))
+        self.assertEqual(None, cache.get_cache().get(cache.make_fragments_key('budget')))
+        self.assertEqual('budget', idioticonize('budget', theme='not-existing-theme'))
+
+    def test_skip_tags_and_words(self):
+        html = '<a href="#budget" title="budget">budget</a> budgets <!-- budget -->'
+        self.assertEqual(html, idioticonize(html))
+
+    def test_rebuilt_on_change(self):
+        self.assertEqual('new term', idioticonize('new term'))
+        shortcuts.add_term('new-term', definition='Brand new')
+        self.assertEqual('<span title="Brand new">new term</span>', idioticonize('new term'))
+
+    def test_filter(self):
+        output = Template("{% load idioticon %}{{ text|idioticonize:'abbr' }}").render(
+            Context({'text': 'a <budget>'}))
+        self.assertEqual('a &lt;<abbr title="Money plan">budget</abbr>&gt;', output)
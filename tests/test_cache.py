@@ -0,0 +1,76 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+test_cache
+----------
+
+Tests for `idioticon` cache module.
+"""
+from django.test.utils import override_settings
+
+from idioticon import shortcuts, cache
+from tests.utils import AliasChainTestCase
+
+
+class TestIdioticonCache(AliasChainTestCase):
+
+    def test_get_term_is_cached(self):
+        self.manager.get_term('my-term')
+        with self.assertNumQueries(0):
+            term = shortcuts.get_term('my-term')
+        self.assertEqual(term, self.term)
+        self.assertEqual(term.get_name(), 'My term')
+
+    def test_save_invalidates_aliases(self):
+        for key in ('my-term', 'my-alias', 'my-sub-alias'):
+            self.manager.get_term(key)
+
+        self.term.name = 'My new term'
+        self.term.save()
+
+        for key in ('my-term', 'my-alias', 'my-sub-alias'):
+            self.assertEqual(None, cache.get_cached_term(key))
+        self.assertEqual('My new term', self.manager.get_term('my-alias').get_name())
+
+    def test_rename_invalidates_old_key(self):
+        self.manager.get_term('my-term')
+        self.term.key = 'my-renamed-term'
+        self.term.save()
+        self.assertEqual(None, shortcuts.get_term('my-term'))
+
+    def test_delete_invalidates(self):
+        self.manager.get_term('my-term')
+        shortcuts.delete_term('my-term')
+        self.assertEqual(None, shortcuts.get_term('my-term'))
+        self.assertEqual(None, shortcuts.get_term('my-alias'))
+
+    def test_missing_keys_are_cached(self):
+        self.assertEqual(None, shortcuts.get_term('not-existing-term'))
+        with self.assertNumQueries(0):
+            self.assertEqual(None, shortcuts.get_term('not-existing-term'))
+            terms = shortcuts.get_terms(['not-existing-term'])
+            self.assertRaises(self.manager.model.DoesNotExist, self.manager.get_term, 'not-existing-term')
+        self.assertEqual([None], list(terms.values()))
+
+        shortcuts.get_terms(['other-missing-term'])
+        with self.assertNumQueries(0):
+            self.assertEqual(None, shortcuts.get_term('other-missing-term'))
+
+    def test_missing_keys_are_invalidated(self):
+        for key in ('new-term', 'new-alias', 'set-term'):
+            shortcuts.get_term(key)
+        shortcuts.add_term('new-term', 'New term')
+        shortcuts.add_alias('new-term', 'new-alias')
+        shortcuts.set_term('set-term', 'Set term')
+        self.assertEqual('New term', shortcuts.get_term('new-term').get_name())
+        self.assertEqual('New term', shortcuts.get_term('new-alias').get_name())
+        self.assertEqual('Set term', shortcuts.get_term('set-term').get_name())
+
+    @override_settings(IDIOTICON_MISSING_MAX_KEYS=2)
+    def test_missing_keys_are_bounded(self):
+        shortcuts.get_terms(['missing-1', 'missing-2', 'missing-3'])
+        cached = cache.get_cached_terms(['missing-1', 'missing-2', 'missing-3'])
+        self.assertEqual(2, len(cached))
+        self.assertTrue(all(cache.is_missing(value) for value in cached.values()))
+        shortcuts.get_term('missing-4')
+        self.assertEqual(None, cache.get_cached_term('missing-4'))
@@ -0,0 +1,141 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+test_commands
+-------------
+
+Tests for `idioticon` management commands.
+"""
+import json
+import os
+import shutil
+import tempfile
+from django.core.files.storage import FileSystemStorage
+from django.core.management import call_command, CommandError
+from django.template import Template, Context
+from django.test.utils import override_settings
+from django.utils.six import StringIO
+
+from idioticon import shortcuts, cache
+from tests.utils import BudgetTestCase, TermTestCase
+
+
+class TestIdioticonImportExport(TermTestCase):
+
+    def setUp(self):
+        super(TestIdioticonImportExport, self).setUp()
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        super(TestIdioticonImportExport, self).tearDown()
+        shutil.rmtree(self.directory)
+
+    def _write(self, filename, content):
+        path = os.path.join(self.directory, filename)
+        with open(path, 'wb') as f:
+            f.write(content.encode('utf-8'))
+        return path
+
+    def test_import_csv(self):
+        self.manager.create(key='budget', name='Old budget')
+        path = self._write('terms.csv', u'key,main_term,name,definition\n'
+                                        u'bilancio,budget,,\n'
+                                        u'budget,,Budget,Money plan\n'
+                                        u'città,,Città,Una città\n')
+        out = StringIO()
+        call_command('idioticon_import', path, batch_size=2, stdout=out)
+        self.assertIn('2 terms created, 1 terms updated', out.getvalue())
+
+        alias = self.manager.get_term('bilancio')
+        self.assertEqual('Budget', alias.get_name())
+        self.assertEqual('budget', alias.root_term.key)
+        self.assertEqual(u'Una città', self.manager.get_term(u'città').get_definition())
+
+    def test_import_jsonl(self):
+        path = self._write('terms.jsonl', u'{"key": "budget", "name": "Budget"}\n'
+                                          u'{"key": "bilancio", "main_term": "budget"}\n'
+                                          u'{"key": "sub-bilancio", "main_term": "bilancio"}\n')
+        call_command('idioticon_import', path, stdout=StringIO())
+        self.assertEqual('Budget', self.manager.get_term('sub-bilancio').get_name())
+        self.assertEqual('budget', self.manager.get_term('sub-bilancio').root_term.key)
+
+    def test_import_errors(self):
+        path = self._write('terms.jsonl', u'{"key": "bilancio", "main_term": "budget"}\n')
+        self.assertRaises(CommandError, call_command, 'idioticon_import', path, stdout=StringIO())
+        path = self._write('terms.jsonl', u'{"key": "budget", "color": "red"}\n')
+        self.assertRaises(CommandError, call_command, 'idioticon_import', path, stdout=StringIO())
+        self.assertFalse(self.manager.exists())
+
+    def test_export(self):
+        term = self.manager.create(key='budget', name='Budget', definition='Money plan')
+        self.manager.create(key='bilancio', main_term=term)
+
+        out = StringIO()
+        call_command('idioticon_export', format='jsonl', batch_size=1, stdout=out)
+        rows = [json.loads(line) for line in out.getvalue().splitlines()]
+        self.assertEqual([
+            {'key': 'budget', 'main_term': None, 'name': 'Budget', 'definition': 'Money plan'},
+            {'key': 'bilancio', 'main_term': 'budget', 'name': '', 'definition': ''},
+        ], rows)
+
+        path = os.path.join(self.directory, 'terms.csv')
+        call_command('idioticon_export', path)
+        self.manager.all().delete()
+        call_command('idioticon_import', path, stdout=StringIO())
+        self.assertEqual('Budget', self.manager.get_term('bilancio').get_name())
+
+    def test_rebuild_roots(self):
+        term = self.manager.create(key='budget', name='Budget')
+        alias = self.manager.create(key='bilancio', main_term=term)
+        self.manager.create(key='bilanci', main_term=alias)
+        # rows written before root terms existed
+        self.manager.update(root_term=None)
+        out = StringIO()
+        call_command('idioticon_rebuild_roots', stdout=out)
+        self.assertIn('2 root terms fixed', out.getvalue())
+        self.assertEqual('budget', self.manager.get_term('bilanci').get_root_key())
+
+
+class TestIdioticonBundle(BudgetTestCase):
+
+    def setUp(self):
+        super(TestIdioticonBundle, self).setUp()
+        self.directory = tempfile.mkdtemp()
+        self.storage = FileSystemStorage(location=self.directory, base_url='/static/')
+        self.settings_override = override_settings(STATIC_ROOT=self.directory, STATIC_URL='/static/')
+        self.settings_override.enable()
+
+    def tearDown(self):
+        self.settings_override.disable()
+        super(TestIdioticonBundle, self).tearDown()
+        shutil.rmtree(self.directory)
+
+    def test_bundle(self):
+        out = StringIO()
+        call_command('idioticon_bundle', stdout=out)
+        self.assertIn('Glossary bundles written: en-us.', out.getvalue())
+
+        url = Template("{% load idioticon %}{% glossary_bundle_url %}").render(Context())
+        self.assertTrue(url.startswith('/static/idioticon/glossary.en-us.'))
+        with self.storage.open(url[len('/static/'):]) as f:
+            self.assertEqual({
+                'budget': ['Budget', 'Money plan', None],
+                'bilancio': ['Budget', 'Money plan', 'budget'],
+            }, json.loads(f.read().decode('utf-8')))
+
+        out = StringIO()
+        call_command('idioticon_bundle', stdout=out)
+        self.assertIn('up to date', out.getvalue())
+
+        shortcuts.set_term('budget', definition='A new money plan')
+        cache.get_cache().clear()
+        call_command('idioticon_bundle', stdout=StringIO())
+        self.assertNotEqual(url, Template("{% load idioticon %}{% glossary_bundle_url %}").render(Context()))
+
+    def test_bundle_with_manifest_storage(self):
+        # bundles are already hashed: their urls must not be hashed again
+        with self.settings(STATICFILES_STORAGE='django.contrib.staticfiles.storage.ManifestStaticFilesStorage'):
+            call_command('idioticon_bundle', stdout=StringIO())
+            url = Template("{% load idioticon %}{% glossary_bundle_url %}").render(Context())
+        self.assertTrue(url.startswith('/static/idioticon/glossary.en-us.'))
+        self.assertTrue(os.path.exists(os.path.join(self.directory, url[len('/static/'):])))
@@ -0,0 +1,61 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+test_lazy
+---------
+
+Tests for `idioticon` lazy module.
+"""
+from django.http import HttpResponse
+from django.template import Template, Context
+from django.test import RequestFactory
+
+from idioticon import shortcuts
+from idioticon.lazy import TermRegistry, TermRegistryMiddleware, get_registry, set_registry
+from tests.utils import BudgetTestCase
+
+
+class TestIdioticonLazyTerms(BudgetTestCase):
+
+    def setUp(self):
+        super(TestIdioticonLazyTerms, self).setUp()
+        set_registry(TermRegistry())
+
+    def tearDown(self):
+        set_registry(None)
+        super(TestIdioticonLazyTerms, self).tearDown()
+
+    def test_lazy_terms(self):
+        with self.assertNumQueries(0):
+            budget = shortcuts.get_term('budget', lazy=True)
+            terms = shortcuts.get_terms(['bilancio', 'missing'], lazy=True)
+            self.assertTrue(budget is shortcuts.get_term('budget', lazy=True))
+
+        with self.assertNumQueries(1):
+            self.assertEqual('Budget', terms['bilancio'].get_name())
+            self.assertEqual('Money plan', budget.get_definition())
+            self.assertFalse(terms['missing'])
+
+    def test_lazy_load_terms(self):
+        template = Template(
+            "{% load idioticon %}{% load_terms 'budget' as a %}{% load_terms 'bilancio' as b %}"
+            "{{ b.get_name }}{% term_tag 'budget' %}")
+        with self.assertNumQueries(1):
+            self.assertEqual('Budget<span title="Money plan">Budget</span>', template.render(Context()))
+
+    def test_changed_terms_are_forgotten(self):
+        budget = shortcuts.get_term('budget', lazy=True)
+        self.assertEqual('Budget', budget.get_name())
+        shortcuts.set_term('budget', name='New budget')
+        self.assertEqual('New budget', shortcuts.get_term('budget', lazy=True).get_name())
+
+    def test_middleware(self):
+        middleware = TermRegistryMiddleware()
+        set_registry(None)
+        # without a registry, lookups are not lazy
+        self.assertTrue(type(shortcuts.get_term('budget', lazy=True)) is shortcuts.get_term_model())
+
+        middleware.process_request(RequestFactory().get('/'))
+        self.assertTrue(isinstance(get_registry(), TermRegistry))
+        middleware.process_response(None, HttpResponse())
+        self.assertEqual(None, get_registry())
@@ -0,0 +1,64 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+test_metrics
+------------
+
+Tests for `idioticon` metrics module.
+"""
+from django.http import HttpResponse
+from django.template import Template, Context
+from django.test import RequestFactory
+from django.test.utils import override_settings
+
+from idioticon import shortcuts
+from idioticon.metrics import TermMetrics, TermMetricsMiddleware, get_collector, set_collector, metrics_collected
+from tests.utils import BudgetTestCase
+
+
+class TestIdioticonMetrics(BudgetTestCase):
+
+    def setUp(self):
+        super(TestIdioticonMetrics, self).setUp()
+        self.metrics = TermMetrics()
+        set_collector(self.metrics)
+
+    def tearDown(self):
+        set_collector(None)
+        super(TestIdioticonMetrics, self).tearDown()
+
+    def test_lookups(self):
+        shortcuts.get_terms(['budget', 'bilancio', 'missing'])
+        shortcuts.get_term('bilancio')
+        self.assertEqual({'lookups': 4, 'cache_hits': 1, 'cache_misses': 3, 'queries': 1,
+                          'alias_hops': 2, 'renders': 0, 'render_time': 0.0}, self.metrics.as_dict())
+
+    def test_renders(self):
+        Template("{% load idioticon %}{% load_terms 'budget' as a %}{% term_tag 'bilancio' %}").render(Context())
+        self.assertEqual(2, self.metrics.renders)
+        self.assertEqual(2, self.metrics.lookups)
+        self.assertTrue(self.metrics.render_time > 0)
+
+    def test_disabled(self):
+        set_collector(None)
+        shortcuts.get_term('budget')
+        self.assertEqual(0, self.metrics.lookups)
+
+    @override_settings(IDIOTICON_METRICS_HEADER='X-Idioticon')
+    def test_middleware(self):
+        received = []
+
+        def receiver(sender, metrics, request, **kwargs):
+            received.append(metrics)
+        metrics_collected.connect(receiver)
+
+        middleware = TermMetricsMiddleware()
+        request = RequestFactory().get('/')
+        middleware.process_request(request)
+        shortcuts.get_term('budget')
+        response = middleware.process_response(request, HttpResponse())
+        metrics_collected.disconnect(receiver)
+
+        self.assertTrue(get_collector() is None)
+        self.assertEqual(1, received[0].lookups)
+        self.assertIn('lookups=1', response['X-Idioticon'])
@@ -7,12 +7,15 @@ test_idioticon
 Tests for `idioticon` models module.
 """
 import unittest
+import mock
 from django.test.utils import override_settings
 from django.utils.text import slugify
+from django.core.exceptions import ValidationError
 from django.test import TestCase
 import faker
 
-from idioticon import shortcuts
+from idioticon import checks, shortcuts, cache
+from tests.utils import AliasChainTestCase
 
 
 class TestIdioticonGetTerm(unittest.TestCase):
@@ -94,6 +97,30 @@ class TestIdioticonGetTerm(unittest.TestCase):
         self.assertEqual(None, self.manager.get_term('not-existing-term', soft_error=True))
 
 
+class TestIdioticonGetTerms(AliasChainTestCase):
+
+    def setUp(self):
+        super(TestIdioticonGetTerms, self).setUp()
+        self.other = self.manager.create(key='other-term', name='Other term')
+
+    def test_get_terms(self):
+        with self.assertNumQueries(1):
+            terms = self.manager.get_terms(['other-term', 'my-alias', 'my-term'])
+            self.assertEqual(['other-term', 'my-alias', 'my-term'], list(terms.keys()))
+            self.assertEqual('My term', terms['my-alias'].get_name())
+        with self.assertNumQueries(0):
+            self.manager.get_terms(['my-term', self.other])
+        terms = self.manager.get_terms(key for key in ['my-term', 'other-term'])
+        self.assertEqual([self.term, self.other], list(terms.values()))
+
+    def test_get_terms_missing(self):
+        self.assertRaises(shortcuts.get_term_model().DoesNotExist,
+                          self.manager.get_terms, ['my-term', 'not-existing-term'])
+        terms = shortcuts.get_terms(['not-existing-term', 'my-term'])
+        self.assertEqual(None, terms['not-existing-term'])
+        self.assertEqual(self.term, terms['my-term'])
+
+
 class TestIdioticonShortcuts(unittest.TestCase):
 
     def setUp(self):
@@ -123,6 +150,15 @@ class TestIdioticonShortcuts(unittest.TestCase):
 
         self.assertTrue(shortcuts.set_term('not-existent-term', name='...'))
 
+    def test_set_term_reads_the_database(self):
+        self._create_term('my-term')
+        shortcuts.get_term('my-term')
+        # the cached copy is now stale
+        shortcuts.get_term_model().objects.filter(key='my-term').update(definition='A new description')
+        shortcuts.set_term('my-term', name='My new term')
+        term = shortcuts.get_term_model().objects.get(key='my-term')
+        self.assertEqual(('My new term', 'A new description'), (term.name, term.definition))
+
     def test_update_term(self):
         term = self._create_term('my-term')
         self.assertTrue(term)
@@ -151,6 +187,58 @@ class TestIdioticonShortcuts(unittest.TestCase):
         self.assertTrue(shortcuts.add_alias(term, alias))
         self.assertEqual(term, alias.main_term)
 
+class TestIdioticonBulkShortcuts(AliasChainTestCase):
+
+    def test_set_terms(self):
+        self.manager.get_term('my-alias')
+        with self.assertNumQueries(6):
+            # savepoint, fetch, update, bulk_create, release, aliases lookup for cache invalidation
+            summary = shortcuts.set_terms([
+                'new-term',
+                {'key': 'other-term', 'name': 'Other term'},
+                {'key': 'my-term', 'definition': 'A new description'},
+            ])
+        self.assertEqual({'created': 2, 'updated': 1, 'deleted': 0}, summary)
+        self.assertEqual('A new description', self.manager.get_term('my-alias').get_definition())
+        self.assertEqual('Other term', self.manager.get_term('other-term').get_name())
+
+    def test_set_terms_links(self):
+        self.manager.create(key='other-term', name='Other term')
+        summary = shortcuts.set_terms(['my-term', {'key': 'my-alias', 'main_term': 'other-term'}])
+        self.assertEqual({'created': 0, 'updated': 1, 'deleted': 0}, summary)
+        self.assertEqual('other-term', self.manager.get_term('my-sub-alias').get_root_key())
+        self.assertRaises(ValidationError, shortcuts.set_terms, [{'key': 'other-term', 'main_term': 'my-sub-alias'}])
+
+    def test_update_terms(self):
+        summary = shortcuts.update_terms([{'key': 'my-term', 'name': 'Renamed'}, {'key': 'missing', 'name': '...'}])
+        self.assertEqual({'created': 0, 'updated': 1, 'deleted': 0}, summary)
+        self.assertFalse(self.manager.filter(key='missing').exists())
+        self.assertEqual('Renamed', self.manager.get_term('my-sub-alias').get_name())
+
+    def test_delete_terms(self):
+        other = self.manager.create(key='other-term')
+        self.assertEqual({'created': 0, 'updated': 0, 'deleted': 4},
+                         shortcuts.delete_terms(['my-term', other, 'missing']))
+        self.assertFalse(self.manager.exists())
+
+    def test_delete_terms_invalidates_once(self):
+        for key in ('a', 'b', 'c'):
+            term = self.manager.create(key=key)
+            self.manager.create(key=key + '-alias', main_term=term)
+        self.manager.get_terms(['a-alias', 'my-sub-alias'])
+        with mock.patch.object(cache.get_cache(), 'delete_many', wraps=cache.get_cache().delete_many) as delete_many:
+            self.assertEqual(9, shortcuts.delete_terms(['a', 'b', 'c', 'my-term'])['deleted'])
+        self.assertEqual(1, delete_many.call_count)
+        self.assertEqual(None, self.manager.get_term('a-alias', soft_error=True))
+        self.assertEqual(None, self.manager.get_term('my-sub-alias', soft_error=True))
+
+    def test_delete_terms_without_cascade(self):
+        self.assertEqual(1, shortcuts.delete_terms(['my-term'], alias_cascade=False)['deleted'])
+        alias = self.manager.get_term('my-alias')
+        self.assertTrue(alias.is_main_term)
+        self.assertEqual(alias, self.manager.get_term('my-sub-alias').root_term)
+
+
 class TestIdioticonConf(TestCase):
 
     custom_text_field = 'tests.utils.CustomTextField'
@@ -169,4 +257,93 @@ class TestIdioticonConf(TestCase):
         from idioticon.conf import settings
         self.assertEqual(settings.IDIOTICON_THEME, 'abbr')
         from idioticon.templatetags.idioticon import do_term_tag
-        self.assertIn('<abbr', do_term_tag('key'))
\ No newline at end of file
+        self.assertIn('<abbr', do_term_tag('key'))
+
+
+class TestIdioticonRootTerm(AliasChainTestCase):
+
+    def test_root_term(self):
+        self.assertEqual(None, self.term.root_term)
+        self.assertEqual(self.term, self.alias.root_term)
+        self.assertEqual(self.term, self.sub_alias.root_term)
+
+        with self.assertNumQueries(1):
+            sub_alias = self.manager.get_term('my-sub-alias')
+            self.assertEqual('My term', sub_alias.get_name())
+            self.assertEqual('Just a description', sub_alias.get_definition())
+
+    def test_reparenting(self):
+        other = self.manager.create(key='other-term', name='Other term')
+        self.alias.main_term = other
+        self.alias.save()
+        self.assertEqual(other, self.manager.get(key='my-sub-alias').root_term)
+
+        self.alias.main_term = None
+        self.alias.save()
+        self.assertEqual(self.alias, self.manager.get(key='my-sub-alias').root_term)
+        self.assertEqual('my-alias', self.manager.get_term('my-sub-alias').get_name())
+
+    def test_cycle_is_rejected(self):
+        self.term.main_term = self.sub_alias
+        self.assertRaises(ValidationError, self.term.save)
+        self.term.main_term = self.term
+        self.assertRaises(ValidationError, self.term.full_clean)
+        # a cycle below the main term
+        self.alias.main_term = self.sub_alias
+        self.assertRaises(ValidationError, self.alias.save)
+        self.assertEqual(([], []), self.manager.check_alias_chains())
+
+    def test_intermediate_override(self):
+        self.alias.name, self.alias.definition = 'My alias', 'An alias description'
+        self.alias.save()
+        deep_alias = self.manager.create(key='my-deep-alias', main_term=self.sub_alias)
+        for key in ('my-sub-alias', 'my-deep-alias'):
+            with self.assertNumQueries(1):
+                alias = self.manager.get_term(key)
+                self.assertEqual('My alias', alias.get_name())
+                self.assertEqual('An alias description', alias.get_definition())
+        self.assertEqual(self.term, deep_alias.root_term)
+
+    def test_resolve_roots(self):
+        with self.assertNumQueries(1):
+            roots = self.manager.resolve_roots(['my-sub-alias', 'my-term', 'missing', 'my-alias'])
+        self.assertEqual(['my-sub-alias', 'my-term', 'missing', 'my-alias'], list(roots))
+        self.assertEqual({'my-sub-alias': 'my-term', 'my-term': 'my-term', 'missing': None, 'my-alias': 'my-term'},
+                         dict((key, root and root.key) for key, root in roots.items()))
+        self.assertEqual(None, self.manager.resolve_roots(['my-sub-alias'], max_depth=1)['my-sub-alias'])
+
+    def test_check_alias_chains(self):
+        self.assertEqual(([], []), self.manager.check_alias_chains())
+        self.assertEqual(([], ['my-sub-alias']), self.manager.check_alias_chains(max_depth=1))
+
+        # save() rejects cycles, update() doesn't
+        self.manager.filter(key='my-term').update(main_term=self.sub_alias)
+        self.assertEqual((['my-alias', 'my-sub-alias', 'my-term'], []), self.manager.check_alias_chains())
+        self.assertEqual(None, self.manager.resolve_roots(['my-alias'])['my-alias'])
+        self.assertEqual(['idioticon.E001'] * 3, [error.id for error in checks.check_alias_chains()])
+
+
+class TestIdioticonNarrowTerms(AliasChainTestCase):
+
+    def test_narrow_get_term(self):
+        with self.assertNumQueries(1):
+            alias = shortcuts.get_term('my-alias', fields=('name',))
+            self.assertEqual('My term', alias.get_name())
+        self.assertNotIn('definition', alias.root_term.__dict__)
+
+        shortcuts.get_terms(['my-term', 'missing'], fields=('name',))
+        with self.assertNumQueries(0):
+            terms = shortcuts.get_terms(['my-alias', 'my-term', 'missing'], fields=('name',))
+            self.assertEqual('My term', terms['my-term'].get_name())
+            self.assertEqual(None, terms['missing'])
+
+    def test_full_terms_are_preferred(self):
+        shortcuts.get_term('my-term')
+        with self.assertNumQueries(0):
+            term = shortcuts.get_term('my-term', fields=('name',))
+        self.assertEqual('Just a description', term.definition)
+
+    def test_narrow_terms_are_invalidated(self):
+        shortcuts.get_term('my-alias', fields=('name',))
+        shortcuts.set_term('my-term', name='My new term')
+        self.assertEqual('My new term', shortcuts.get_term('my-alias', fields=('name',)).get_name())
@@ -0,0 +1,77 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+test_search
+-----------
+
+Tests for `idioticon` search module.
+"""
+import json
+import mock
+from django.core.urlresolvers import reverse
+
+from idioticon import shortcuts
+from idioticon.search import FallbackBackend, install_index
+from tests.utils import TermTestCase
+
+
+class TestIdioticonSearch(TermTestCase):
+
+    def setUp(self):
+        super(TestIdioticonSearch, self).setUp()
+        self.manager.create(key='apple', name='Apple', definition='A red fruit growing on trees')
+        self.manager.create(key='banana', name='Banana', definition='A yellow fruit')
+        self.manager.create(key='tree', name='Tree', definition='A tall plant')
+
+    def test_search(self):
+        self.assertEqual(['banana'], [t.key for t in self.manager.search('yellow')])
+        self.assertEqual(['apple', 'banana'], sorted(t.key for t in self.manager.search('fruit')))
+        # prefixes of every word
+        self.assertEqual(['apple'], [t.key for t in self.manager.search('fru red')])
+        self.assertEqual([], list(self.manager.search('   ')))
+
+    def test_ranking(self):
+        # the term named tree comes before the one mentioning trees
+        self.assertEqual(['tree', 'apple'], [t.key for t in self.manager.search('tree')])
+
+    def test_index_follows_writes(self):
+        shortcuts.update_term('banana', definition='A long curved fruit')
+        self.assertEqual([], list(self.manager.search('yellow')))
+        shortcuts.set_terms([{'key': 'lemon', 'name': 'Lemon', 'definition': 'A yellow citrus'}])
+        self.assertEqual(['lemon'], [t.key for t in self.manager.search('yellow')])
+        shortcuts.delete_term('lemon')
+        self.assertEqual([], list(self.manager.search('citrus')))
+
+    def test_install_index(self):
+        install_index()
+        self.assertEqual(['banana'], [t.key for t in self.manager.search('yellow')])
+
+    def test_sqlite_without_fts5(self):
+        from django.db import connection, DatabaseError
+        if connection.vendor != 'sqlite':
+            return
+        cursor = connection.cursor()
+
+        def execute(sql, params=None):
+            if 'fts5' in sql:
+                raise DatabaseError("no such module: fts5")
+            return cursor.execute(sql, params)
+
+        with mock.patch.object(connection, 'cursor', return_value=mock.Mock(execute=execute)):
+            install_index()
+        try:
+            self.assertEqual(['banana'], [t.key for t in self.manager.search('yellow')])
+            shortcuts.set_term('banana', definition='A curved fruit')
+            self.assertEqual([], list(self.manager.search('yellow')))
+        finally:
+            install_index()
+
+    def test_fallback(self):
+        queryset = FallbackBackend(None).search(self.manager.all(), ['fruit', 'red'], None)
+        self.assertEqual(['apple'], [t.key for t in queryset])
+
+    def test_search_view(self):
+        response = self.client.get(reverse('idioticon_search'), {'q': 'fruit'})
+        data = json.loads(response.content.decode('utf-8'))
+        self.assertEqual(['apple', 'banana'], sorted(term['key'] for term in data['terms']))
+        self.assertEqual(400, self.client.get(reverse('idioticon_search')).status_code)
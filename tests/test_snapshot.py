@@ -0,0 +1,97 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+test_snapshot
+-------------
+
+Tests for `idioticon` snapshot module.
+"""
+import pickle
+
+from django.core.management import call_command
+from django.template import Template, Context
+from django.test.utils import override_settings
+from django.utils.six import StringIO
+
+from idioticon import shortcuts, cache, snapshot
+from tests.utils import BudgetTestCase
+
+
+@override_settings(IDIOTICON_SNAPSHOT=True, IDIOTICON_SNAPSHOT_INTERVAL=0)
+class TestIdioticonSnapshot(BudgetTestCase):
+
+    def setUp(self):
+        snapshot.drop_snapshot()
+        super(TestIdioticonSnapshot, self).setUp()
+
+    def tearDown(self):
+        snapshot.drop_snapshot()
+        super(TestIdioticonSnapshot, self).tearDown()
+
+    def test_reads_from_snapshot(self):
+        shortcuts.get_term('budget')
+        with self.assertNumQueries(0):
+            self.assertEqual('Budget', shortcuts.get_term('bilancio').get_name())
+            self.assertEqual(None, shortcuts.get_term('missing'))
+            terms = shortcuts.get_terms(['budget', 'missing'])
+        self.assertEqual(['budget', 'missing'], list(terms))
+        self.assertRaises(shortcuts.get_term_model().DoesNotExist, shortcuts.get_term, 'missing', soft_error=False)
+
+    def test_writes_swap_snapshot(self):
+        old = snapshot.get_snapshot()
+        shortcuts.set_term('budget', name='New budget')
+        self.assertEqual('Budget', old.terms['budget'].name)
+        self.assertEqual('New budget', shortcuts.get_term('bilancio').get_name())
+        self.assertFalse(old is snapshot.get_snapshot())
+
+    def test_other_process_writes(self):
+        old = snapshot.get_snapshot()
+        # as bumped by another process
+        cache.bump_glossary_version()
+        self.assertEqual(None, snapshot.get_snapshot(load=False))
+        self.assertFalse(old is snapshot.get_snapshot())
+        self.assertTrue(snapshot.get_snapshot() is snapshot.get_snapshot(load=False))
+
+    def test_warm_command(self):
+        out = StringIO()
+        call_command('idioticon_warm', stdout=out)
+        self.assertIn('2 terms cached', out.getvalue())
+        self.assertEqual('budget', cache.get_cached_term('budget').key)
+        self.assertEqual('bilancio', cache.get_cached_term('bilancio').key)
+
+
+@override_settings(IDIOTICON_TERM_SNAPSHOTS=True)
+class TestIdioticonTermSnapshot(BudgetTestCase):
+
+    def test_term_snapshot(self):
+        alias = shortcuts.get_term('bilancio')
+        self.assertTrue(isinstance(alias, snapshot.TermSnapshot))
+        self.assertEqual('Budget', alias.get_name())
+        self.assertEqual('Money plan', alias.get_definition())
+        self.assertEqual('Money plan', alias.get_summary())
+        self.assertTrue(alias.is_alias)
+        self.assertEqual('budget', alias.get_root_key())
+        self.assertEqual(alias, pickle.loads(pickle.dumps(alias, pickle.HIGHEST_PROTOCOL)))
+        self.assertRaises(AttributeError, setattr, alias, 'key', 'other')
+
+    def test_cached_snapshots(self):
+        shortcuts.get_terms(['budget', 'bilancio', 'missing'])
+        # only the snapshots are cached, missing keys included
+        self.assertEqual(None, cache.get_cached_term('budget'))
+        with self.assertNumQueries(0):
+            self.assertEqual(None, shortcuts.get_term('missing'))
+        with self.assertNumQueries(0):
+            output = Template("{% load idioticon %}{% load_terms 'bilancio' as b %}{{ b.get_name }}"
+                              "{% term_tag 'budget' %}").render(Context())
+        self.assertEqual('Budget<span title="Money plan">Budget</span>', output)
+
+        shortcuts.set_term('budget', name='New budget')
+        self.assertEqual('New budget', shortcuts.get_term('bilancio').get_name())
+
+    @override_settings(IDIOTICON_SNAPSHOT=True)
+    def test_glossary_snapshot(self):
+        snapshot.drop_snapshot()
+        try:
+            self.assertTrue(isinstance(shortcuts.get_term('budget'), snapshot.TermSnapshot))
+        finally:
+            snapshot.drop_snapshot()
@@ -0,0 +1,136 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+test_templatetags
+-----------------
+
+Tests for `idioticon` templatetags module.
+"""
+import mock
+from django.core.signals import request_finished
+from django.template import Template, Context
+
+from idioticon import shortcuts
+from idioticon.templatetags.idioticon import do_term_tag
+from tests.utils import AliasChainTestCase, TermTestCase
+
+
+class TestIdioticonLoadTerms(AliasChainTestCase):
+
+    def setUp(self):
+        super(TestIdioticonLoadTerms, self).setUp()
+        self.manager.create(key='other-term', name='Other term')
+
+    def test_load_terms(self):
+        template = Template(
+            "{% load idioticon %}"
+            "{% load_terms 'my-term' 'my-alias' other-term as a b c %}"
+            "{{ a.get_name }}|{{ b.get_definition }}|{{ c.get_name }}"
+        )
+        with self.assertNumQueries(1):
+            output = template.render(Context())
+        self.assertEqual('My term|Just a description|Other term', output)
+
+
+class TestIdioticonTermTag(AliasChainTestCase):
+
+    def setUp(self):
+        super(TestIdioticonTermTag, self).setUp()
+        self.alias.name = 'My alias'
+        self.alias.save()
+        self.manager.create(key='other-term', name='Other term')
+
+    def test_term_tag(self):
+        output = Template("{% load idioticon %}{% term_tag 'my-term' theme='abbr' %}").render(Context())
+        self.assertEqual('<abbr title="Just a description">My term</abbr>', output)
+
+    def test_term_tag_variable(self):
+        output = Template("{% load idioticon %}{% term_tag key theme=theme %}").render(
+            Context({'key': 'my-alias', 'theme': 'dt'}))
+        self.assertEqual('<dt>My alias</dt><dd>Just a description</dd>', output)
+
+    def test_template_terms_prefetch(self):
+        template = Template(
+            "{% load idioticon %}"
+            "{% term_tag 'my-term' %}{% term_tag 'my-alias' %}{% term_tag 'not-existing-term' %}"
+            "{% load_terms 'other-term' as other %}{{ other.get_name }}"
+        )
+        # the missing key is reported when the request finishes
+        with self.assertNumQueries(1):
+            output = template.render(Context())
+        self.assertIn('My alias', output)
+        self.assertIn('Other term', output)
+
+    def test_term_tag_fragment_cache(self):
+        template = Template("{% load idioticon %}{% term_tag 'my-term' theme='abbr' %}")
+        template.render(Context())
+        with self.assertNumQueries(0):
+            output = Template("{% load idioticon %}{% term_tag 'my-term' theme='abbr' %}").render(Context())
+        self.assertEqual('<abbr title="Just a description">My term</abbr>', output)
+
+        self.term.definition = 'A new description'
+        self.term.save()
+        self.assertEqual('<abbr title="A new description">My alias</abbr>',
+                         Template("{% load idioticon %}{% term_tag 'my-alias' theme='abbr' %}").render(Context()))
+        self.assertEqual('<abbr title="A new description">My term</abbr>', template.render(Context()))
+
+    def test_prerendered_themes(self):
+        with self.settings(IDIOTICON_PRERENDER_THEMES=('span', 'abbr')):
+            self.term.definition = 'A new description'
+            self.term.save()
+        with mock.patch('idioticon.templatetags.idioticon.get_theme_template') as get_theme_template:
+            with self.assertNumQueries(0):
+                output = Template("{% load idioticon %}{% term_tag 'my-alias' theme='abbr' %}"
+                                  "{% term_tag 'my-term' %}").render(Context())
+        self.assertFalse(get_theme_template.called)
+        self.assertEqual('<abbr title="A new description">My alias</abbr>'
+                         '<span title="A new description">My term</span>', output)
+
+    def test_term_tag_summary(self):
+        shortcuts.set_term('my-term', definition='<p>A <em>rich</em>\n definition &amp; ' + 'more ' * 100 + '</p>')
+        self.assertEqual('A rich definition & more', self.term.__class__.objects.get(key='my-alias').get_summary()[:24])
+        output = Template("{% load idioticon %}{% term_tag 'my-alias' %}").render(Context())
+        self.assertTrue(output.startswith('<span title="A rich definition &amp; more more'))
+        self.assertLess(len(output), 200)
+        with self.settings(IDIOTICON_SUMMARY_LENGTH=1000):
+            shortcuts.set_term('my-term', name='My term')
+        self.assertEqual(255, len(self.term.__class__.objects.get(key='my-term').summary))
+
+        shortcuts.set_terms([{'key': 'other-term', 'definition': '<b>Bold</b>'}])
+        self.assertEqual('Bold', shortcuts.get_term('other-term').summary)
+
+    def test_term_tag_unknown_theme(self):
+        self.assertEqual('', do_term_tag('my-term', theme='not-existing-theme'))
+
+
+class TestIdioticonSuggest(TermTestCase):
+
+    def setUp(self):
+        super(TestIdioticonSuggest, self).setUp()
+        for key in ('my-term', 'my-terms', 'other-term', 'unrelated'):
+            shortcuts.add_term(key)
+
+    def test_suggest(self):
+        self.assertEqual('my-term', self.manager.suggest('my-trem')[0])
+        self.assertEqual([], self.manager.suggest('zzz'))
+        # refreshed when the glossary changes
+        shortcuts.add_term('my-trek')
+        self.assertEqual('my-trek', self.manager.suggest('my-trem')[0])
+
+    def test_missing_term_logged(self):
+        with mock.patch('idioticon.suggest.log') as log:
+            Template("{% load idioticon %}{% term_tag 'my-trem' %}{% term_tag 'my-trem' %}").render(Context())
+            self.assertFalse(log.warning.called)
+            request_finished.send(sender=None)
+            log.warning.assert_called_once_with("Term %r not found, did you mean %s?", 'my-trem', mock.ANY)
+
+            # reported at once with the current index, the stale one is never rebuilt while rendering
+            Template("{% load idioticon %}{% term_tag 'my-treks' %}").render(Context())
+            self.assertEqual(2, log.warning.call_count)
+            shortcuts.add_term('my-trek')
+            with self.assertNumQueries(1):
+                Template("{% load idioticon %}{% term_tag 'my-trekz' %}").render(Context())
+            self.assertEqual(2, log.warning.call_count)
+            request_finished.send(sender=None)
+            self.assertEqual('my-trekz', log.warning.call_args[0][1])
+            self.assertIn("'my-trek'", log.warning.call_args[0][2])
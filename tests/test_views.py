@@ -0,0 +1,101 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+test_views
+----------
+
+Tests for `idioticon` views module.
+"""
+import json
+from django.core.urlresolvers import reverse
+from django.test import RequestFactory
+
+from idioticon import shortcuts
+from idioticon.views import GlossaryView
+from tests.utils import BudgetTestCase, TermTestCase
+
+
+class TestIdioticonGlossaryView(TermTestCase):
+
+    def setUp(self):
+        super(TestIdioticonGlossaryView, self).setUp()
+        for key in ('apple', 'avocado', 'banana', 'cherry', '3d-print'):
+            self.manager.create(key=key, name=key.capitalize(), definition='A %s' % key)
+        self.manager.create(key='apricot', main_term=self.manager.get(key='apple'))
+        self.url = reverse('idioticon_glossary')
+
+    def test_keyset_pagination(self):
+        view = GlossaryView.as_view(paginate_by=2)
+
+        context = view(RequestFactory().get(self.url)).context_data
+        self.assertEqual(['3d-print', 'apple'], [t.key for t in context['terms']])
+        self.assertTrue(context['has_next'])
+        self.assertFalse(context['has_previous'])
+
+        response = view(RequestFactory().get(self.url, {'after': 'apple'})).render()
+        self.assertEqual(['apricot', 'avocado'], [t.key for t in response.context_data['terms']])
+        self.assertContains(response, '<dd>A apple</dd>')
+
+        context = view(RequestFactory().get(self.url, {'before': 'apricot'})).context_data
+        self.assertEqual(['3d-print', 'apple'], [t.key for t in context['terms']])
+        self.assertFalse(context['has_previous'])
+
+    def test_letters(self):
+        response = self.client.get(self.url, {'letter': 'a'})
+        self.assertEqual([('#', 1), ('A', 3), ('B', 1), ('C', 1)], response.context['letters'])
+        self.assertEqual(['apple', 'apricot', 'avocado'], [t.key for t in response.context['terms']])
+
+        response = self.client.get(self.url, {'letter': '#'})
+        self.assertEqual(['3d-print'], [t.key for t in response.context['terms']])
+
+        self.assertEqual(404, self.client.get(self.url, {'letter': 'z'}).status_code)
+
+        with self.assertNumQueries(1):
+            self.client.get(self.url)
+
+        shortcuts.add_term('zucchini')
+        self.assertEqual(200, self.client.get(self.url, {'letter': 'z'}).status_code)
+
+
+class TestIdioticonTermsView(BudgetTestCase):
+
+    def setUp(self):
+        super(TestIdioticonTermsView, self).setUp()
+        self.url = reverse('idioticon_terms')
+
+    def test_terms(self):
+        response = self.client.get(self.url, {'keys': 'bilancio,missing'})
+        self.assertEqual(200, response.status_code)
+        self.assertEqual({
+            'bilancio': {'key': 'bilancio', 'name': 'Budget', 'definition': 'Money plan', 'main_term': 'budget'},
+            'missing': None,
+        }, json.loads(response.content.decode('utf-8')))
+        self.assertTrue(response.has_header('Last-Modified'))
+        self.assertEqual(400, self.client.get(self.url).status_code)
+
+    def test_conditional_get(self):
+        response = self.client.get(self.url, {'keys': 'budget,bilancio'})
+        etag = response['ETag']
+
+        with self.assertNumQueries(0):
+            response = self.client.get(self.url, {'keys': 'budget,bilancio'}, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(304, response.status_code)
+
+        self.term.definition = 'A new money plan'
+        self.term.save()
+        response = self.client.get(self.url, {'keys': 'budget,bilancio'}, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(200, response.status_code)
+        self.assertNotEqual(etag, response['ETag'])
+
+    def test_conditional_get_intermediate_alias(self):
+        self.manager.create(key='sub-bilancio', main_term=self.alias)
+        response = self.client.get(self.url, {'keys': 'sub-bilancio'})
+        etag = response['ETag']
+        self.assertEqual('Budget', json.loads(response.content.decode('utf-8'))['sub-bilancio']['name'])
+
+        self.alias.name = 'Bilancio'
+        self.alias.save()
+        response = self.client.get(self.url, {'keys': 'sub-bilancio'}, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(200, response.status_code)
+        self.assertNotEqual(etag, response['ETag'])
+        self.assertEqual('Bilancio', json.loads(response.content.decode('utf-8'))['sub-bilancio']['name'])
@@ -1,4 +1,38 @@
 from django.db.models import TextField
+from django.test import TestCase
+
+from idioticon import shortcuts, cache
+
 
 class CustomTextField(TextField):
     pass
+
+
+class TermTestCase(TestCase):
+    """Clears the terms cache around every test: rolled back rows don't send signals."""
+
+    def setUp(self):
+        cache.get_cache().clear()
+        self.manager = shortcuts.get_term_model().objects
+
+    def tearDown(self):
+        cache.get_cache().clear()
+
+
+class AliasChainTestCase(TermTestCase):
+    """Creates my-term, its alias my-alias and my-sub-alias, alias of my-alias."""
+
+    def setUp(self):
+        super(AliasChainTestCase, self).setUp()
+        self.term = self.manager.create(key='my-term', name='My term', definition='Just a description')
+        self.alias = self.manager.create(key='my-alias', main_term=self.term)
+        self.sub_alias = self.manager.create(key='my-sub-alias', main_term=self.alias)
+
+
+class BudgetTestCase(TermTestCase):
+    """Creates budget and its alias bilancio."""
+
+    def setUp(self):
+        super(BudgetTestCase, self).setUp()
+        self.term = self.manager.create(key='budget', name='Budget', definition='Money plan')
+        self.alias = self.manager.create(key='bilancio', main_term=self.term)